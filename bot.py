@@ -1,23 +1,37 @@
 """TradingLions main orchestrator following the CodeX overhaul brief (multi-asset)."""
 
 from __future__ import annotations
+import threading
 import time
 import os
+from queue import Empty, SimpleQueue
 from dataclasses import dataclass
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from collector import MarketCollector
 from config import BotConfig
 from decision_engine import Decision, DecisionEngine
 from execution import ExecutionEngine
+from indicators import warm_up_kernels
 from logger import TradeLogger
 from result_watcher import ResultWatcher
 
-# Screenshot opcional
+# Mapa activo -> active_id para decodificar el stream de velas
 try:
-    import pyautogui  # type: ignore
+    from iqoptionapi.constants import ACTIVES  # type: ignore
 except Exception:
-    pyautogui = None
+    ACTIVES = {}
+
+# Parser JSON rapido para el WebSocket (orjson > ujson > json)
+try:
+    from orjson import loads as _json_loads  # type: ignore
+except ImportError:
+    try:
+        from ujson import loads as _json_loads  # type: ignore
+    except ImportError:
+        from json import loads as _json_loads
+
+_OUTCOME_BY_SIGN = ("loss", "draw", "win")
 
 @dataclass(slots=True)
 
@@ -31,6 +45,9 @@ class PendingEntry:
 class TradingLionsBot:
     """Coordinates collector, decision engine, execution, and logging for multiple assets."""
 
+    # Velas pedidas por REST hasta tener historial; luego solo las ultimas 3
+    WARMUP_CANDLES = 30
+
     def __init__(
         self,
         config: Optional[BotConfig] = None,
@@ -39,8 +56,45 @@ class TradingLionsBot:
     ) -> None:
         self.config = config or BotConfig()
         self.tick_interval = tick_interval
+        # Trazas [DEBUG] solo con BOT_DEBUG=1 (el escaneo emite decenas por tick)
+        self._debug_enabled = os.environ.get("BOT_DEBUG", "0") == "1"
+        self._debug_second = -1
+        self._debug_stamp = ""
+        # Valores de config usados en cada tick (la config no cambia en runtime)
+        self._assets = tuple(self.config.assets)
+        self._min_payout = self.config.signals.min_payout
+        self._min_vol = self.config.signals.min_volatility
+        self._score_ceiling = self.config.signals.score_ceiling
+        # Score del último escaneo por activo: se evalúa primero el más prometedor
+        self._last_scores: Dict[str, float] = {}
+        self._tf = int(self.config.timeframe)
+        self._tf_higher = int(self.config.higher_timeframe)
+        # Escaneo una vez por vela, scan_lead segundos antes de la apertura
+        self._scan_lead = float(self.config.scan_lead)
+        self._next_scan_at = 0.0
         self.api = api
-        
+        # Los eventos WS despiertan el loop principal sin esperar al siguiente tick
+        self._wake = threading.Event()
+        # Velas por stream WS: ultima llegada por (activo, "M1"/"M5")
+        self._asset_by_active_id = {
+            ACTIVES[a]: a for a in self._assets if a in ACTIVES
+        }
+        self._last_ws_candle_at: Dict[Tuple[str, str], float] = {}
+        # Velas WS pendientes de ingerir: el hilo del websocket solo encola y
+        # el loop principal es el unico que escribe/lee los rings del collector
+        self._ws_candles: SimpleQueue = SimpleQueue()
+        self._ws_streams_started = False
+
+        # Tabla de despacho por nombre de evento (lookup O(1) por frame)
+        self._ws_dispatch = {
+            # Evento principal con resultados REALES
+            "option-closed": self._handle_option_closed,
+            # Útil para debugging y refuerzos futuros
+            "position-changed": self._handle_position_message,
+            # Velas en vivo (solo si se suscribio el stream)
+            "candle-generated": self._handle_candle_generated,
+        }
+
         # === ASIGNAR HANDLER WEBSOCKET ===
         try:
             self.api.api.websocket.on_message = self._ws_on_message
@@ -49,8 +103,10 @@ class TradingLionsBot:
             print("[WS] Error asignando handler:", e)
 
         self.asset = self.config.asset
+        # Compilar kernels JIT antes del primer tick (cache=True lo hace barato)
+        warm_up_kernels()
         self.collector = MarketCollector(self.config.signals)
-        for a in self.config.assets:
+        for a in self._assets:
             self.collector._ensure_store(a)
         self.logger = TradeLogger(self.config)
         self.decision_engine = DecisionEngine(self.config, api=self.api)
@@ -76,36 +132,74 @@ class TradingLionsBot:
     # ------------------------------------------------------------------
 
     def _debug(self, msg: str) -> None:
-        print(f"[DEBUG {time.strftime('%H:%M:%S')}] {msg}")
-
-    import pyautogui
-    import pygetwindow as gw
-    import time
-    import os
-    import json
-    import time
+        if not self._debug_enabled:
+            return
+        # strftime una sola vez por segundo (hora local, como antes)
+        second = int(time.time())
+        if second != self._debug_second:
+            self._debug_second = second
+            self._debug_stamp = time.strftime("%H:%M:%S", time.localtime(second))
+        print(f"[DEBUG {self._debug_stamp}] {msg}")
 
     # ================================
     # HANDLER DE MENSAJES: on_message
     # ================================
     def _ws_on_message(self, ws, message):
+        # El JSON valido mas corto ocupa 2 bytes ("{}")
+        if not message or len(message) < 2:
+            return
         try:
-            data = json.loads(message)
-        except:
+            # orjson acepta bytes directamente: sin decode previo
+            data = _json_loads(message)
+        except (ValueError, TypeError):
+            return
+        if not isinstance(data, dict):
             return
 
-        name = data.get("name")
-        msg = data.get("msg", {})
+        handler = self._ws_dispatch.get(data.get("name"))
+        if handler is not None:
+            handler(data.get("msg", {}))
 
-        # Evento principal con resultados REALES
-        if name == "option-closed":
-            self._handle_option_closed(msg)
+    def _handle_position_message(self, msg):
+        pos = msg.get("position")
+        if pos:
+            self._handle_position_changed(pos)
 
-        # Útil para debugging y refuerzos futuros
-        elif name == "position-changed":
-            pos = msg.get("position")
-            if pos:
-                self._handle_position_changed(pos)
+    def _handle_candle_generated(self, msg):
+        asset = self._asset_by_active_id.get(msg.get("active_id"))
+        if asset is None:
+            return
+        size = msg.get("size")
+        if size == self._tf:
+            tf_key = "M1"
+        elif size == self._tf_higher:
+            tf_key = "M5"
+        else:
+            return
+        self._ws_candles.put((asset, tf_key, msg))
+        self._last_ws_candle_at[(asset, tf_key)] = time.time()
+
+    def _drain_ws_candles(self) -> None:
+        queue = self._ws_candles
+        ingest = self.collector.ingest
+        while True:
+            try:
+                asset, tf_key, msg = queue.get_nowait()
+            except Empty:
+                return
+            ingest(asset, tf_key, msg)
+
+    def _start_candle_streams(self) -> None:
+        self._ws_streams_started = True
+        start_stream = getattr(self.api, "start_candles_stream", None)
+        if not callable(start_stream):
+            return
+        for asset in self._asset_by_active_id.values():
+            for size in (self._tf, self._tf_higher):
+                try:
+                    start_stream(asset, size, 1)
+                except Exception as e:
+                    print(f"[WS] No se pudo abrir stream de velas {asset}/{size}: {e}")
 
     # ======================================
     # PROCESAR CIERRE REAL DE LA OPERACIÓN
@@ -136,17 +230,13 @@ class TradingLionsBot:
             or 0.0
         )
 
-        # Determine outcome
-        if profit > 0:
-            outcome = "win"
-        elif profit < 0:
-            outcome = "loss"
-        else:
-            outcome = "draw"
+        # Determine outcome: indice por signo (-1, 0, 1) -> loss/draw/win
+        profit = float(profit)
+        outcome = _OUTCOME_BY_SIGN[(profit > 0) - (profit < 0) + 1]
 
         # Validate active order
-        active = getattr(self.execution, "_active_order", None)
-        if not isinstance(active, dict):
+        active = self.execution._active_order
+        if active is None:
             print("[WS CLOSE] Cierre recibido pero no existe _active_order en memoria.")
             return
 
@@ -158,7 +248,7 @@ class TradingLionsBot:
 
         # Mark closure
         active["outcome"] = outcome
-        active["profit"] = float(profit)
+        active["profit"] = profit
         active["closed_at"] = time.time()
 
         # Register into CSV/JSONL logs
@@ -179,15 +269,17 @@ class TradingLionsBot:
                         "pattern": active.get("pattern"),
                         "score": active.get("score"),
                     },
+                    trade_id=active.get("trade_id"),
                 )
             except Exception as e:
                 print("[WS CLOSE] Error al escribir log:", e)
 
         # Cleanup
-        self.execution._active_order = None
+        self.execution.clear_active()
         self.current_trade = None
         self.reinforced = False
         self._resolution_wait_start = None
+        self._wake.set()
 
         print(f"[WS CLOSE] {active['asset']} {outcome.upper()} profit={profit}")
 
@@ -204,6 +296,7 @@ class TradingLionsBot:
             print("[WS] position-changed:", pos.get("id"), pos.get("status"))
         except:
             pass
+        self._wake.set()
 
 
     def _save_trade_screenshot(self, asset: str, label: str, ts: float) -> None:
@@ -211,6 +304,13 @@ class TradingLionsBot:
         Captura SOLO la ventana de IQ Option. 
         Si IQ Option estÃ¡ minimizado â†’ lo restaura, lo trae al frente y toma la foto.
         """
+        # Import diferido: librerias GUI pesadas (Pillow, etc.) solo si se usa
+        try:
+            import pyautogui  # type: ignore
+            import pygetwindow as gw  # type: ignore
+        except Exception:
+            self._debug("[SHOT] pyautogui/pygetwindow no disponibles.")
+            return
         try:
             # Buscar una ventana que contenga el tÃ­tulo "IQ Option"
             windows = gw.getWindowsWithTitle("IQ Option")
@@ -261,6 +361,12 @@ class TradingLionsBot:
 
     def run(self) -> None:
         self._running = True
+        if (
+            self.api is not None
+            and self.config.ws_candle_streams
+            and not self._ws_streams_started
+        ):
+            self._start_candle_streams()
         while self._running:
             try:
                 tick_time = time.time()
@@ -272,8 +378,17 @@ class TradingLionsBot:
                             time.sleep(1)
                     except Exception:
                         pass
-                self._sync_market_data(tick_time)
-                self._handle_signal(tick_time)
+                self._drain_ws_candles()
+                scan_due = tick_time >= self._next_scan_at
+                if scan_due or self.execution._active_order is not None:
+                    self._sync_market_data(tick_time)
+                if scan_due:
+                    # Reprogramar antes de escanear: un fallo no debe repetir el escaneo
+                    lead = self._scan_lead
+                    self._next_scan_at = (
+                        self._next_candle_open_timestamp(tick_time + lead) - lead
+                    )
+                    self._handle_signal(tick_time)
                 self._enter_trade(tick_time)
                 self._resolve_trade(tick_time)
                 # activar periodic win_check para fallback
@@ -282,12 +397,16 @@ class TradingLionsBot:
                         self.watcher._run_fallback_check(blocking=False)
                     except Exception:
                         pass
-                time.sleep(self.tick_interval)
+                # Despertar justo a la hora de escaneo si llega antes que el tick
+                timeout = min(self.tick_interval, self._next_scan_at - time.time())
+                self._wake.wait(max(0.0, timeout))
+                self._wake.clear()
             except Exception as e:
                 print(f"[CRITICAL LOOP ERROR] {e}")
 
     def stop(self) -> None:
         self._running = False
+        self._wake.set()
 
     # ------------------------------------------------------------------
 
@@ -304,28 +423,33 @@ class TradingLionsBot:
             )
             return
         best: Optional[PendingEntry] = None
+        # Misma apertura objetivo para todos los activos del tick
+        next_open = self._next_candle_open_timestamp(tick_time)
+        last_scores = self._last_scores
         self._debug("---- ESCANEO DE ACTIVOS ----")
-        for asset in self.config.assets:
+        # sorted() es estable: a igual score se mantiene el orden de config
+        for asset in sorted(self._assets, key=lambda a: -last_scores.get(a, 0.0)):
             payout = self._fetch_current_payout(asset)
             vol = self._estimate_volatility(asset)
             self._debug(f"{asset}: payout={payout:.2f}, vol={vol:.5f}")
-            if payout < self.config.signals.min_payout:
+            if payout < self._min_payout:
                 self._debug(" â†’ DESCARTADO por payout insuficiente")
                 continue
-            if vol < self.config.signals.min_volatility:
+            if vol < self._min_vol:
                 self._debug(" â†’ DESCARTADO por volatilidad insuficiente")
                 continue
             decision, decision_context = self.decision_engine.evaluate(
-                self.collector, asset, payout
+                self.collector, asset, payout, now=tick_time
             )
             if decision is None:
+                last_scores[asset] = 0.0
                 self._debug(" â†’ NO HAY SEÃ‘AL vÃ¡lida")
                 continue
+            last_scores[asset] = decision.score
             self._debug(
                 f"  SEÃ‘AL: {decision.pattern.upper()} | dir={decision.direction} | "
                 f"score={decision.score:.2f} | regime={decision.regime}"
             )
-            next_open = self._next_candle_open_timestamp(tick_time)
             candidate = PendingEntry(
                 asset=asset,
                 decision=decision,
@@ -336,6 +460,9 @@ class TradingLionsBot:
             if best is None or decision.score > best.decision.score:
                 best = candidate
                 self._debug(" â†’ NUEVO MEJOR CANDIDATO")
+            if best.decision.score >= self._score_ceiling:
+                # Ningún otro activo puede superarlo
+                break
         if best is None:
             self._debug("NO se encontrÃ³ ninguna seÃ±al vÃ¡lida en este tick.")
             return
@@ -421,20 +548,16 @@ class TradingLionsBot:
         return self.config.risk.base_stake
 
     def _try_reinforce(self, tick_time: float) -> None:
-        if not self.execution.has_active_order():
-            return
         if self.reinforced:
             return
-        order = getattr(self.execution, "_active_order", None)
-        if not isinstance(order, dict):
+        order = self.execution._active_order
+        if order is None:
             return
         asset = order["asset"]
         direction = order["direction"]
         entry_price = float(order.get("entry_price", 0.0))
-        candles = self.collector.get_candles_m1(asset, 1)
-        if not candles:
-            return
-        last_price = float(candles[-1].get("close", entry_price))
+        # Sin velas devuelve entry_price: ninguna condicion de refuerzo se cumple
+        last_price = self.collector.last_close(asset, default=entry_price)
         if direction == "call" and last_price < entry_price * 0.998:
             self._debug(f"[REFUERZO] CALL mejorado en {asset}")
             self._execute_reinforcement(asset, direction, last_price)
@@ -476,29 +599,20 @@ class TradingLionsBot:
 
 
     def _resolve_trade(self, tick_time: float) -> None:
-        if not self.execution.has_active_order():
+        execution = self.execution
+        if execution._active_order is None:
             self._resolution_wait_start = None
             return
 
-        active = getattr(self.execution, "_active_order", None)
-        if not isinstance(active, dict):
-            self.execution._active_order = None
-            self.current_trade = None
-            self.reinforced = False
-            self._resolution_wait_start = None
-            return
-
-        opened_at = float(active.get("opened_at", tick_time))
-        duration_cfg = float(active.get("duration", 1)) * 60.0
-        elapsed = tick_time - opened_at
-
-        if elapsed < duration_cfg:
+        # La operacion (y su refuerzo, si lo hubo) termina cuando vence la ultima orden
+        execution.pop_expired(tick_time)
+        if execution.has_pending_resolutions():
             if self._resolution_wait_start is None:
                 self._resolution_wait_start = tick_time
             self._try_reinforce(tick_time)
             return
 
-        self.execution._active_order = None
+        execution.clear_active()
         self.current_trade = None
         self.reinforced = False
         self._resolution_wait_start = None
@@ -516,29 +630,67 @@ class TradingLionsBot:
         # Mantener la sincronizacion incluso con orden activa para evitar freeze.
         if self.pending_entry is not None:
             return
-        for asset in self.config.assets:
-            snapshot = self._fetch_market_snapshot(asset)
+        # Un solo get_all_profit y un solo reloj por tick para todos los activos
+        now = time.time()
+        try:
+            payouts = self._fetch_all_payouts()
+        except Exception:
+            return
+        # Activos con M1 y M5 frescos por WS: solo actualizar payout
+        assets = self._assets
+        ws_seen = self._last_ws_candle_at
+        if ws_seen:
+            fresh_before = now - self._tf
+            assets = []
+            for asset in self._assets:
+                if (
+                    ws_seen.get((asset, "M1"), 0.0) > fresh_before
+                    and ws_seen.get((asset, "M5"), 0.0) > fresh_before
+                ):
+                    self.collector.update_payout(
+                        asset, self._extract_payout(asset, payouts)
+                    )
+                else:
+                    assets.append(asset)
+        for asset in assets:
+            snapshot = self._fetch_market_snapshot(asset, payouts=payouts, now=now)
             self._apply_market_snapshot(snapshot, tick_time)
 
     def _apply_market_snapshot(
         self, snapshot: Dict[str, Any], tick_time: float
     ) -> None:
+        # El snapshot siempre trae exactamente M1 y M5 (ver _fetch_market_snapshot).
         asset = snapshot["asset"]
-        for timeframe, candles in snapshot["candles"].items():
-            for candle in candles:
-                self.collector.ingest(asset, timeframe, candle)
-        self.collector.update_payout(asset, snapshot["payout"])
-
-    def _fetch_market_snapshot(self, asset: str) -> Dict[str, Any]:
+        candles = snapshot["candles"]
+        collector = self.collector
+        collector.ingest_many(asset, "M1", candles["M1"])
+        collector.ingest_many(asset, "M5", candles["M5"])
+        collector.update_payout(asset, snapshot["payout"])
+
+    def _fetch_all_payouts(self) -> Any:
+        method_name = "".join(["get_all_", "pro", "fit"])
+        get_payouts = getattr(self.api, method_name, None)
+        return get_payouts() if callable(get_payouts) else {}
+
+    def _fetch_market_snapshot(
+        self,
+        asset: str,
+        payouts: Any = None,
+        now: Optional[float] = None,
+    ) -> Dict[str, Any]:
         if self.api is None:
             raise RuntimeError("API not configured")
-        now = time.time()
+        if now is None:
+            now = time.time()
+        # El collector descarta lo ya visto, asi que pedir de mas solo cuesta payload
+        warmup = self.WARMUP_CANDLES
+        count_m1 = 3 if self.collector.candle_count(asset, "M1") >= warmup else warmup
+        count_m5 = 3 if self.collector.candle_count(asset, "M5") >= warmup else warmup
         try:
-            raw_m1 = self.api.get_candles(asset, self.config.timeframe, 3, now)
-            raw_m5 = self.api.get_candles(asset, self.config.higher_timeframe, 3, now)
-            method_name = "".join(["get_all_", "pro", "fit"])
-            get_payouts = getattr(self.api, method_name, None)
-            payouts = get_payouts() if callable(get_payouts) else {}
+            raw_m1 = self.api.get_candles(asset, self._tf, count_m1, now)
+            raw_m5 = self.api.get_candles(asset, self._tf_higher, count_m5, now)
+            if payouts is None:
+                payouts = self._fetch_all_payouts()
         except Exception:
             return {
                 "asset": asset,
@@ -556,22 +708,24 @@ class TradingLionsBot:
             return []
         candles_m1 = _normalize_candles(raw_m1)
         candles_m5 = _normalize_candles(raw_m5)
-        payout = 0.0
+        return {
+            "asset": asset,
+            "candles": {"M1": candles_m1, "M5": candles_m5},
+            "payout": self._extract_payout(asset, payouts),
+        }
+
+    @staticmethod
+    def _extract_payout(asset: str, payouts: Any) -> float:
         if isinstance(payouts, dict):
             info = payouts.get(asset)
             if isinstance(info, dict):
                 for key in ("turbo", "binary", "digital"):
                     if key in info and info[key]:
                         try:
-                            payout = float(info[key])
-                            break
+                            return float(info[key])
                         except (TypeError, ValueError):
                             continue
-        return {
-            "asset": asset,
-            "candles": {"M1": candles_m1, "M5": candles_m5},
-            "payout": payout,
-        }
+        return 0.0
 
     def _fetch_current_payout(self, asset: str) -> float:
         payout = self.collector.get_payout(asset)
@@ -584,27 +738,19 @@ class TradingLionsBot:
         return snapshot["payout"]
 
     def _estimate_volatility(self, asset: str) -> float:
-        candles = self.collector.get_candles_m1(asset, 20)
-        if len(candles) < 10:
-            return 0.0
-        return self.collector.compute_volatility(candles)
+        return self.collector.volatility(asset, "M1", min_count=10)
 
     def _next_candle_open_timestamp(self, tick_time: float) -> float:
         """Return the next candle open aligned with the configured timeframe."""
 
-        interval = int(self.config.timeframe)
-        base = int(tick_time // interval) * interval
-        next_open = base + interval
-        return float(next_open)
+        interval = self._tf
+        return float(tick_time // interval * interval + interval)
 
     def _fetch_open_price(self, asset: str) -> float:
         if self.api is None:
-            candles = self.collector.get_candles_m1(asset, 1)
-            if candles:
-                return float(candles[-1].get("close", 0.0))
-            return 0.0
+            return self.collector.last_close(asset)
         try:
-            live = self.api.get_live_candle(asset, self.config.timeframe)
+            live = self.api.get_live_candle(asset, self._tf)
             if isinstance(live, dict):
                 return float(
                     live.get("open", live.get("current", live.get("close", 0.0)))
@@ -612,16 +758,13 @@ class TradingLionsBot:
         except Exception:
             pass
         now = time.time()
-        candles = self.api.get_candles(asset, self.config.timeframe, 1, now)
+        candles = self.api.get_candles(asset, self._tf, 1, now)
         if isinstance(candles, dict):
             c = candles
         elif isinstance(candles, (list, tuple)) and candles:
             c = candles[-1]
         else:
-            candles = self.collector.get_candles_m1(asset, 1)
-            if candles:
-                return float(candles[-1].get("close", 0.0))
-            return 0.0
+            return self.collector.last_close(asset)
         return float(c.get("open", c.get("close", 0.0)))
 
     def _build_snapshot(self, asset: str) -> Dict[str, Any]:
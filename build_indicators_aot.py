@@ -0,0 +1,40 @@
+"""Build the ahead-of-time compiled indicator kernels (``indicators_aot``).
+
+Uso: ``python build_indicators_aot.py`` desde la carpeta del bot. Genera la
+extension ``indicators_aot`` (.so/.pyd) junto a este archivo; ``indicators``
+la importa si existe y evita la compilacion JIT del primer arranque. Requiere
+numba y un compilador C (MSVC Build Tools en Windows).
+"""
+
+from __future__ import annotations
+
+import os
+
+from numba.pycc import CC  # type: ignore
+
+import indicators
+
+# Firmas explicitas: columnas float64 (contiguas o no) y enteros int64
+SIGNATURES = {
+    "atr_kernel": "f8(f8[:], f8[:], f8[:], i8)",
+    "true_ranges_kernel": "f8[:](f8[:], f8[:], f8[:])",
+    "ema_last2_kernel": "UniTuple(f8, 2)(f8[:], i8)",
+    "ema_series_kernel": "f8[:](f8[:], i8)",
+    "momentum_kernel": "f8(f8[:], i8)",
+    "range_stats_kernel": "UniTuple(f8, 2)(f8[:], f8[:])",
+    "range_bounds_kernel": "UniTuple(f8, 5)(f8[:], f8[:], f8)",
+}
+
+
+def build(output_dir: str | None = None) -> None:
+    cc = CC("indicators_aot")
+    cc.output_dir = output_dir or os.path.dirname(os.path.abspath(__file__))
+    cc.verbose = True
+    for name, signature in SIGNATURES.items():
+        # Siempre la version Python: indicators puede estar usando una extension previa
+        cc.export(name, signature)(indicators._PY_KERNELS[name])
+    cc.compile()
+
+
+if __name__ == "__main__":
+    build()
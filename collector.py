@@ -3,24 +3,278 @@
 from __future__ import annotations
 
 import time
-from collections import deque
-from typing import Any, Deque, Dict, Mapping, MutableMapping, Optional, Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
 
 from config import SignalSettings
 from indicators import (
     atr as indicator_atr,
+    atr_kernel,
     average_range,
     detect_micro_range as indicator_detect_micro_range,
-    ema as indicator_ema,
-    ema_series,
+    ema_last2_kernel,
     impulse_direction,
-    momentum_score,
+    momentum_kernel,
+    range_bounds_kernel,
+    range_stats_kernel,
 )
 
 PriceCandle = Mapping[str, Any]
 
 DEFAULT_SIGNAL_SETTINGS = SignalSettings()
 
+# Columnas del ring buffer SoA
+COL_TIME = 0
+COL_OPEN = 1
+COL_HIGH = 2
+COL_LOW = 3
+COL_CLOSE = 4
+COL_VOLUME = 5
+N_COLUMNS = 6
+
+
+class CandleColumns(NamedTuple):
+    """Read-only float64 column views over the newest candles (oldest first)."""
+
+    time: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+
+class TrendBias(NamedTuple):
+    """M5 EMA trend read by ``detect_trend_bias``."""
+
+    bias: float = 0.0
+    ema_fast: float = 0.0
+    ema_slow: float = 0.0
+    ema_slope: float = 0.0
+    spread: float = 0.0
+    state: str = "range"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # Compatibilidad con el formato dict anterior
+        return getattr(self, key) if key in self._fields else default
+
+
+class RangeBounds(NamedTuple):
+    """Padded M1 range read by ``detect_range``."""
+
+    lower: float = 0.0
+    upper: float = 0.0
+    width: float = 0.0
+    raw_lower: float = 0.0
+    raw_upper: float = 0.0
+    tolerance: float = 0.0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self._fields else default
+
+
+_FLAT_TREND = TrendBias()
+_EMPTY_RANGE = RangeBounds()
+
+
+class _CandleRing:
+    """Mirrored float64 ring buffer: the last *n* rows are always a contiguous view."""
+
+    __slots__ = ("capacity", "count", "head", "data")
+
+    def __init__(self, capacity: int, columns: int = N_COLUMNS) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self.head = 0
+        # Cada fila se escribe dos veces (head y head + capacity) para evitar copias al leer
+        self.data = np.zeros((columns, 2 * capacity), dtype=np.float64)
+
+    def append(self, row: Sequence[float]) -> None:
+        head = self.head
+        self.data[:, head] = row
+        self.data[:, head + self.capacity] = row
+        self.head = (head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def replace_last(self, row: Sequence[float]) -> None:
+        last = (self.head - 1) % self.capacity
+        self.data[:, last] = row
+        self.data[:, last + self.capacity] = row
+
+    def tail(self, column: int, n: int) -> np.ndarray:
+        n = min(n, self.count)
+        end = self.head + self.capacity
+        return self.data[column, end - n : end]
+
+    def columns(self, n: int, copy: bool = False) -> CandleColumns:
+        n = min(n, self.count)
+        end = self.head + self.capacity
+        block = self.data[:, end - n : end]
+        if copy:
+            block = block.copy()
+        block.flags.writeable = False
+        return CandleColumns(*block)
+
+    def last(self, column: int, default: float) -> float:
+        if not self.count:
+            return default
+        return float(self.data[column, self.head + self.capacity - 1])
+
+
+class CandleView(Sequence):
+    """Read-only candle sequence backed by float64 columns.
+
+    Items are ``{"open", "close", "min", "max", "time"}`` dicts, built only
+    when a caller indexes or iterates the view. Contiguous slices stay views. Vectorised code should use
+    :attr:`columns` directly.
+    """
+
+    __slots__ = ("columns", "_dicts")
+
+    def __init__(self, columns: CandleColumns) -> None:
+        self.columns = columns
+        self._dicts: Optional[List[Dict[str, float]]] = None
+
+    def __len__(self) -> int:
+        return self.columns.time.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return CandleView(CandleColumns(*(col[start:stop] for col in self.columns)))
+            return self.as_dicts()[index]
+        if self._dicts is not None:
+            return self._dicts[index]
+        cols = self.columns
+        return {
+            "open": float(cols.open[index]),
+            "close": float(cols.close[index]),
+            "min": float(cols.low[index]),
+            "max": float(cols.high[index]),
+            "time": float(cols.time[index]),
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, float]]:
+        return iter(self.as_dicts())
+
+    def as_dicts(self) -> List[Dict[str, float]]:
+        if self._dicts is None:
+            cols = self.columns
+            self._dicts = [
+                {"open": o, "close": c, "min": lo, "max": hi, "time": t}
+                for t, o, hi, lo, c in zip(
+                    cols.time.tolist(),
+                    cols.open.tolist(),
+                    cols.high.tolist(),
+                    cols.low.tolist(),
+                    cols.close.tolist(),
+                )
+            ]
+        return self._dicts
+
+
+class MarketSnapshot(Mapping[str, Any]):
+    """Read-only market snapshot whose indicators are computed on first read.
+
+    ``evaluate`` only reads m1, trend, range, volatility, pivots and
+    micro_range; ema, atr and momentum are never computed unless some caller
+    asks for them. Computed values live in *fields*, shared by every snapshot
+    of the same candle generation (m1/m5 are copied up front, so indicators
+    always match the candles of that generation); payout and timestamp are
+    per call.
+    """
+
+    __slots__ = ("_collector", "_asset", "_fields", "_payout", "_timestamp")
+
+    KEYS = (
+        "asset",
+        "m1",
+        "m5",
+        "ema",
+        "atr",
+        "trend",
+        "range",
+        "volatility",
+        "micro_range",
+        "momentum",
+        "pivots",
+        "payout",
+        "last_update",
+        "timestamp",
+    )
+
+    def __init__(
+        self,
+        collector: "MarketCollector",
+        asset: str,
+        fields: Dict[str, Any],
+        payout: float,
+        timestamp: float,
+    ) -> None:
+        self._collector = collector
+        self._asset = asset
+        self._fields = fields
+        self._payout = payout
+        self._timestamp = timestamp
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "payout":
+            return self._payout
+        if key == "timestamp":
+            return self._timestamp
+        fields = self._fields
+        if key in fields:
+            return fields[key]
+        if key not in self.KEYS:
+            raise KeyError(key)
+        value = fields[key] = self._compute(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.KEYS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def _compute(self, key: str) -> Any:
+        collector = self._collector
+        if key == "trend":
+            return collector.detect_trend_bias(self["m5"])
+        if key == "range":
+            return collector.detect_range(self["m1"])
+        if key == "volatility":
+            return collector.compute_volatility(self["m1"])
+        if key == "pivots":
+            return collector.compute_otc_pivots(self["m1"])
+        if key == "micro_range":
+            return collector.detect_micro_range(self["m1"])
+        if key == "momentum":
+            return collector.detect_momentum(self["m1"])
+        if key == "atr":
+            return {
+                "m1": collector.compute_atr(self["m1"], 14),
+                "m5": collector.compute_atr(self["m5"], 14),
+            }
+        # ema
+        candles_m1 = self["m1"]
+        candles_m5 = self["m5"]
+        return {
+            "m1": {
+                20: collector.compute_ema(candles_m1, 20),
+                50: collector.compute_ema(candles_m1, 50),
+            },
+            "m5": {
+                20: collector.compute_ema(candles_m5, 20),
+                50: collector.compute_ema(candles_m5, 50),
+            },
+        }
+
 
 class MarketCollector:
     """Stores candles per asset/timeframe and exposes context metrics."""
@@ -33,23 +287,55 @@ class MarketCollector:
     ) -> None:
         self.maxlen_m1 = maxlen_m1
         self.maxlen_m5 = maxlen_m5
-        self._stores: Dict[str, Dict[str, Deque[MutableMapping[str, Any]]]] = {}
+        self._rings: Dict[str, Dict[str, _CandleRing]] = {}
         self._payouts: Dict[str, float] = {}
         self._last_updates: Dict[str, float] = {}
+        # Cache de get_snapshot: se invalida con cada ingest que toca el activo
+        self._generations: Dict[str, int] = {}
+        self._snapshot_cache: Dict[str, Tuple[int, Dict[str, Any]]] = {}
         self._signals = signals_config or DEFAULT_SIGNAL_SETTINGS
+        self._range_tolerance = float(getattr(self._signals, "range_tolerance", 0.35))
+        self._ema_period = int(getattr(self._signals, "ema_period", 20))
+        self._trend_threshold = float(getattr(self._signals, "trend_bias_threshold", 0.3))
 
     # ------------------------------------------------------------------
     # Ingestion / payout updates
     # ------------------------------------------------------------------
     def ingest(self, asset: str, timeframe: str, candle: Mapping[str, Any]) -> None:
-        store = self._ensure_store(asset)
-        tf_key = timeframe.upper()
-        if tf_key not in store:
+        self.ingest_many(asset, timeframe, (candle,))
+
+    def ingest_many(
+        self, asset: str, timeframe: str, candles: Iterable[Mapping[str, Any]]
+    ) -> None:
+        """Ingest a batch of candles resolving the asset/timeframe store once.
+
+        A candle with the same open time as the newest stored one replaces it
+        (live update of the forming candle); older candles are ignored, so
+        overlapping REST fetches and WS updates never duplicate history.
+        """
+
+        ring = self._ensure_store(asset).get(timeframe.upper())
+        if ring is None:
             return
 
-        normalized = self._normalize_candle(candle)
-        store[tf_key].append(normalized)
-        self._last_updates[asset] = normalized.get("time", time.time())
+        to_row = self._candle_row
+        latest = None
+        for candle in candles:
+            row = to_row(candle)
+            candle_time = row[COL_TIME]
+            if ring.count:
+                last_time = ring.last(COL_TIME, candle_time)
+                if candle_time < last_time:
+                    continue
+                if candle_time == last_time:
+                    ring.replace_last(row)
+                    latest = candle_time
+                    continue
+            ring.append(row)
+            latest = candle_time
+        if latest is not None:
+            self._last_updates[asset] = latest
+            self._generations[asset] = self._generations.get(asset, 0) + 1
 
     def update_payout(self, asset: str, payout: float) -> None:
         try:
@@ -60,15 +346,30 @@ class MarketCollector:
     # ------------------------------------------------------------------
     # Candle retrieval helpers
     # ------------------------------------------------------------------
-    def get_candles_m1(self, asset: str, count: int = 180) -> Sequence[PriceCandle]:
-        return list(self._ensure_store(asset)["M1"])[-count:]
+    def get_candles_m1(self, asset: str, count: int = 180) -> CandleView:
+        # Copia: la vista debe sobrevivir a ingests posteriores (contextos, logs)
+        return CandleView(self._ensure_store(asset)["M1"].columns(count, copy=True))
+
+    def get_candles_m5(self, asset: str, count: int = 120) -> CandleView:
+        return CandleView(self._ensure_store(asset)["M5"].columns(count, copy=True))
+
+    def get_columns_m1(self, asset: str, count: int = 180) -> CandleColumns:
+        return self._ensure_store(asset)["M1"].columns(count)
 
-    def get_candles_m5(self, asset: str, count: int = 120) -> Sequence[PriceCandle]:
-        return list(self._ensure_store(asset)["M5"])[-count:]
+    def get_columns_m5(self, asset: str, count: int = 120) -> CandleColumns:
+        return self._ensure_store(asset)["M5"].columns(count)
 
     def get_payout(self, asset: str) -> float:
         return self._payouts.get(asset, 0.0)
 
+    def candle_count(self, asset: str, timeframe: str = "M1") -> int:
+        return self._ensure_store(asset)[timeframe.upper()].count
+
+    def last_close(self, asset: str, timeframe: str = "M1", default: float = 0.0) -> float:
+        """Close of the most recent candle, read straight from the float64 ring."""
+
+        return self._ensure_store(asset)[timeframe.upper()].last(COL_CLOSE, default)
+
     # ------------------------------------------------------------------
     # Technical computations
     # ------------------------------------------------------------------
@@ -77,21 +378,44 @@ class MarketCollector:
             return 0.0
         sample = candles[-max(window, 2) :]
         period = max(1, min(window, len(sample) - 1))
+        if isinstance(sample, CandleView):
+            cols = sample.columns
+            return float(atr_kernel(cols.high, cols.low, cols.close, period))
         atr_value = indicator_atr(sample, period)
         if atr_value is None:
             return average_range(sample)
         return float(atr_value)
 
+    def volatility(self, asset: str, timeframe: str = "M1", window: int = 14, min_count: int = 2) -> float:
+        """Same result as ``compute_volatility`` but read straight from the SoA ring."""
+
+        ring = self._ensure_store(asset)[timeframe.upper()]
+        if ring.count < max(min_count, 2):
+            return 0.0
+        size = max(window, 2)
+        sample_len = min(size, ring.count)
+        period = max(1, min(window, sample_len - 1))
+        value = atr_kernel(
+            ring.tail(COL_HIGH, size),
+            ring.tail(COL_LOW, size),
+            ring.tail(COL_CLOSE, size),
+            period,
+        )
+        return float(value) if value >= 0.0 else 0.0
+
     def compute_ema(self, candles: Sequence[PriceCandle], period: int) -> float:
         closes = self._extract_closes(candles)
-        if not closes:
+        if closes.shape[0] == 0:
             return 0.0
-        value = indicator_ema(closes, period)
-        return float(value) if value is not None else 0.0
+        return float(ema_last2_kernel(closes, period)[0])
 
     def compute_atr(self, candles: Sequence[PriceCandle], period: int = 14) -> float:
         if len(candles) < 2:
             return 0.0
+        if isinstance(candles, CandleView):
+            cols = candles.columns
+            value = atr_kernel(cols.high, cols.low, cols.close, period)
+            return float(value) if value >= 0.0 else 0.0
         value = indicator_atr(candles, period)
         return float(value) if value is not None else 0.0
 
@@ -101,24 +425,10 @@ class MarketCollector:
         if len(candles) < 2:
             return {}
 
-        recent = candles[-max(lookback, 2):]
-        highs: list[float] = []
-        lows: list[float] = []
-        closes: list[float] = []
-        for candle in recent:
-            try:
-                highs.append(float(candle.get('max', candle.get('high', candle.get('close', 0.0)))))
-                lows.append(float(candle.get('min', candle.get('low', candle.get('close', 0.0)))))
-                closes.append(float(candle.get('close', 0.0)))
-            except (TypeError, ValueError):
-                continue
-
-        if not highs or not lows or not closes:
-            return {}
-
-        high = max(highs)
-        low = min(lows)
-        close = closes[-1]
+        cols = self._as_columns(candles[-max(lookback, 2):])
+        high = float(cols.high.max())
+        low = float(cols.low.min())
+        close = float(cols.close[-1])
         pivot = (high + low + close) / 3.0
         range_ = high - low
         r1 = 2 * pivot - low
@@ -140,33 +450,31 @@ class MarketCollector:
         }
 
 
-    def detect_range(self, candles: Sequence[PriceCandle], lookback: int = 40) -> Dict[str, float]:
+    def detect_range(self, candles: Sequence[PriceCandle], lookback: int = 40) -> RangeBounds:
         if len(candles) < 5:
-            return {"lower": 0.0, "upper": 0.0, "width": 0.0, "tolerance": 0.0}
-        recent = candles[-lookback:]
-        lows = [float(c.get("min", c.get("low", 0.0))) for c in recent]
-        highs = [float(c.get("max", c.get("high", 0.0))) for c in recent]
-        raw_lower = min(lows)
-        raw_upper = max(highs)
-        width = raw_upper - raw_lower
-        tolerance_pct = getattr(self._signals, "range_tolerance", 0.35)
-        padding = width * max(0.0, min(1.0, tolerance_pct))
-        lower = raw_lower + padding
-        upper = raw_upper - padding
-        if lower > upper:
-            midpoint = (raw_lower + raw_upper) / 2.0
-            lower = midpoint
-            upper = midpoint
-        return {
-            "lower": lower,
-            "upper": upper,
-            "width": width,
-            "raw_lower": raw_lower,
-            "raw_upper": raw_upper,
-            "tolerance": padding,
-        }
+            return _EMPTY_RANGE
+        cols = self._as_columns(candles[-lookback:])
+        lower, upper, raw_lower, raw_upper, padding = range_bounds_kernel(
+            cols.high, cols.low, self._range_tolerance
+        )
+        return RangeBounds(
+            float(lower),
+            float(upper),
+            float(raw_upper - raw_lower),
+            float(raw_lower),
+            float(raw_upper),
+            float(padding),
+        )
 
     def detect_micro_range(self, candles: Sequence[PriceCandle], lookback: int = 6) -> bool:
+        if isinstance(candles, CandleView):
+            if len(candles) < lookback:
+                return False
+            cols = candles[-lookback:].columns
+            width, avg = range_stats_kernel(cols.high, cols.low)
+            if avg <= 0:
+                return True
+            return bool(width <= avg * 0.25)
         return indicator_detect_micro_range(
             candles,
             lookback=lookback,
@@ -174,8 +482,7 @@ class MarketCollector:
         )
 
     def detect_momentum(self, candles: Sequence[PriceCandle], lookback: int = 8) -> Dict[str, Any]:
-        closes = self._extract_closes(candles)
-        score = momentum_score(closes, lookback)
+        score = momentum_kernel(self._extract_closes(candles), lookback)
         atr_value = self.compute_volatility(candles, window=max(3, lookback))
         impulse: Optional[str] = None
         if candles:
@@ -184,27 +491,19 @@ class MarketCollector:
                 impulse = impulse_direction(candles[-2], atr_value)
         return {"last_impulse": impulse, "strength": float(score)}
 
-    def detect_trend_bias(self, candles_m5: Sequence[PriceCandle]) -> Dict[str, Any]:
-        fast_period = getattr(self._signals, "ema_period", 20)
+    def detect_trend_bias(self, candles_m5: Sequence[PriceCandle]) -> TrendBias:
+        fast_period = self._ema_period
         slow_period = fast_period * 2
-        closes = self._extract_closes(candles_m5)
-        if len(closes) < slow_period:
-            return {
-                "bias": 0.0,
-                "ema_fast": 0.0,
-                "ema_slow": 0.0,
-                "ema_slope": 0.0,
-                "state": "range",
-            }
+        closes = self._as_columns(candles_m5).close
+        if closes.shape[0] < slow_period:
+            return _FLAT_TREND
 
-        fast_series = ema_series(closes, fast_period)
-        slow_series = ema_series(closes, slow_period)
-        ema_fast = fast_series[-1]
-        ema_prev = fast_series[-2] if len(fast_series) >= 2 else ema_fast
-        ema_slow = slow_series[-1] if len(slow_series) >= 1 else ema_fast
+        # Solo hacen falta los dos ultimos puntos de la EMA rapida y el ultimo de la lenta
+        ema_fast, ema_prev = ema_last2_kernel(closes, fast_period)
+        ema_slow = ema_last2_kernel(closes, slow_period)[0]
         ema_slope = ema_fast - ema_prev
         spread = ema_fast - ema_slow
-        slope_threshold = getattr(self._signals, "trend_bias_threshold", 0.3)
+        slope_threshold = self._trend_threshold
 
         bias = 0.0
         if ema_fast > ema_slow and ema_slope > slope_threshold:
@@ -218,94 +517,98 @@ class MarketCollector:
         elif bias < 0:
             state = "trend_down"
 
-        return {
-            "bias": bias,
-            "ema_fast": float(ema_fast),
-            "ema_slow": float(ema_slow),
-            "ema_slope": float(ema_slope),
-            "spread": float(spread),
-            "state": state,
-        }
+        return TrendBias(
+            bias,
+            float(ema_fast),
+            float(ema_slow),
+            float(ema_slope),
+            float(spread),
+            state,
+        )
 
     # ------------------------------------------------------------------
     # Snapshot interface
     # ------------------------------------------------------------------
-    def get_snapshot(self, asset: str) -> Dict[str, Any]:
-        candles_m1 = self.get_candles_m1(asset)
-        candles_m5 = self.get_candles_m5(asset)
-
-        ema_data = {
-            "m1": {
-                20: self.compute_ema(candles_m1, 20),
-                50: self.compute_ema(candles_m1, 50),
-            },
-            "m5": {
-                20: self.compute_ema(candles_m5, 20),
-                50: self.compute_ema(candles_m5, 50),
-            },
-        }
-        atr_data = {
-            "m1": self.compute_atr(candles_m1, 14),
-            "m5": self.compute_atr(candles_m5, 14),
-        }
-
-        pivots = self.compute_otc_pivots(candles_m1)
-
-        price_range = self.detect_range(candles_m1)
-        trend = self.detect_trend_bias(candles_m5)
-        volatility = self.compute_volatility(candles_m1)
-        micro_range = self.detect_micro_range(candles_m1)
-        momentum = self.detect_momentum(candles_m1)
-        last_update = self._last_updates.get(asset, 0.0)
-
-        snapshot = {
-            "asset": asset,
-            "m1": candles_m1,
-            "m5": candles_m5,
-            "ema": ema_data,
-            "atr": atr_data,
-            "trend": trend,
-            "range": price_range,
-            "volatility": volatility,
-            "micro_range": micro_range,
-            "momentum": momentum,
-            "pivots": pivots,
-            "payout": self.get_payout(asset),
-            "last_update": last_update,
-            "timestamp": time.time(),
-        }
-        return snapshot
+    def get_snapshot(self, asset: str, now: Optional[float] = None) -> MarketSnapshot:
+        # ``now``: reloj del tick del llamador; evita un time.time() por activo
+        if now is None:
+            now = time.time()
+        # Sin velas nuevas (ni update de la vela en curso) los indicadores no cambian
+        generation = self._generations.get(asset, 0)
+        cached = self._snapshot_cache.get(asset)
+        if cached is not None and cached[0] == generation:
+            fields = cached[1]
+        else:
+            fields = {
+                "asset": asset,
+                "m1": self.get_candles_m1(asset),
+                "m5": self.get_candles_m5(asset),
+                "last_update": self._last_updates.get(asset, 0.0),
+            }
+            self._snapshot_cache[asset] = (generation, fields)
+        return MarketSnapshot(self, asset, fields, self.get_payout(asset), now)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
-    def _ensure_store(self, asset: str) -> Dict[str, Deque[MutableMapping[str, Any]]]:
-        if asset not in self._stores:
-            self._stores[asset] = {
-                "M1": deque(maxlen=self.maxlen_m1),
-                "M5": deque(maxlen=self.maxlen_m5),
+    def _ensure_store(self, asset: str) -> Dict[str, _CandleRing]:
+        rings = self._rings.get(asset)
+        if rings is None:
+            rings = self._rings[asset] = {
+                "M1": _CandleRing(self.maxlen_m1),
+                "M5": _CandleRing(self.maxlen_m5),
             }
-        return self._stores[asset]
+        return rings
 
     @staticmethod
-    def _normalize_candle(candle: Mapping[str, Any]) -> MutableMapping[str, Any]:
-        normalized: MutableMapping[str, Any] = {
-            "open": float(candle.get("open", candle.get("o", 0.0))),
-            "close": float(candle.get("close", candle.get("c", 0.0))),
-            "min": float(candle.get("min", candle.get("low", 0.0))),
-            "max": float(candle.get("max", candle.get("high", 0.0))),
-        }
+    def _candle_row(candle: Mapping[str, Any]) -> Tuple[float, ...]:
+        """Parse a raw candle once into a ring row (time, open, high, low, close, volume)."""
+
         if "time" in candle:
-            normalized["time"] = float(candle["time"])
+            candle_time = float(candle["time"])
         elif "timestamp" in candle:
-            normalized["time"] = float(candle["timestamp"])
+            candle_time = float(candle["timestamp"])
+        elif "from" in candle:
+            # Formato nativo de IQ Option (REST y stream WS)
+            candle_time = float(candle["from"])
         else:
-            normalized["time"] = time.time()
-        return normalized
+            candle_time = time.time()
+        return (
+            candle_time,
+            float(candle.get("open", candle.get("o", 0.0))),
+            float(candle.get("max", candle.get("high", 0.0))),
+            float(candle.get("min", candle.get("low", 0.0))),
+            float(candle.get("close", candle.get("c", 0.0))),
+            float(candle.get("volume", 0.0) or 0.0),
+        )
+
+    @classmethod
+    def _as_columns(cls, candles: Sequence[PriceCandle]) -> CandleColumns:
+        """Column view of *candles*; plain dict sequences are parsed like ingest does."""
+
+        if isinstance(candles, CandleView):
+            return candles.columns
+        rows = np.array([cls._candle_row(c) for c in candles], dtype=np.float64)
+        return CandleColumns(*rows.reshape(-1, N_COLUMNS).T)
 
     @staticmethod
-    def _extract_closes(candles: Sequence[PriceCandle]) -> Sequence[float]:
-        return [float(c.get("close", 0.0)) for c in candles]
+    def _extract_closes(candles: Sequence[PriceCandle]) -> np.ndarray:
+        """Close prices as a contiguous float64 array (zero-copy for candle views)."""
+
+        if isinstance(candles, CandleView):
+            return candles.columns.close
+        return np.fromiter(
+            (float(c.get("close", 0.0)) for c in candles),
+            dtype=np.float64,
+            count=len(candles),
+        )
 
 
-__all__ = ["MarketCollector"]
+__all__ = [
+    "CandleColumns",
+    "CandleView",
+    "MarketCollector",
+    "MarketSnapshot",
+    "RangeBounds",
+    "TrendBias",
+]
@@ -32,6 +32,8 @@ class SignalSettings:
     trend_bias_threshold: float = 0.3
     range_tolerance: float = 0.35
     min_signal_score: float = 0.55
+    # Score máximo alcanzable (DecisionEngine recorta a 1.0); al llegar se corta el escaneo
+    score_ceiling: float = 1.0
 
 
 # ================================================================
@@ -80,6 +82,14 @@ class BotConfig:
     # Duraci�n de la operaci�n (minutos)
     trade_duration: int = 1
 
+    # Segundos antes de la apertura de vela en que se sincroniza y escanea.
+    # Fuera de esa ventana solo se sincroniza si hay una orden activa.
+    scan_lead: float = 1.0
+
+    # Suscribirse al stream WS de velas (candle-generated). Los activos con
+    # velas WS recientes se saltan la sincronizacion REST.
+    ws_candle_streams: bool = False
+
 
 __all__ = [
     "TIMEFRAME_MAIN",
@@ -2,14 +2,21 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Mapping, Optional, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
-from collector import MarketCollector
+from collector import CandleView, MarketCollector, RangeBounds, TrendBias
 from signals import detect_bearish_pattern, detect_bullish_pattern
 from indicators import atr_micro, bollinger_extreme, fibo_zones
-from dl_autolearn.context_capture import attach_candles_to_context
+from dl_autolearn.context_capture import attach_candles_to_context, candles_from_columns
 from dl_autolearn.inference import autolearn_gate
 
+# Puntaje base por patron (0.55 para el resto)
+_BASE_SCORE_MAP: Dict[str, float] = {
+    "engulfing": 0.7,
+    "momentum": 0.65,
+    "reversal": 0.6,
+}
+
 
 @dataclass(slots=True)
 class Decision:
@@ -41,6 +48,12 @@ class DecisionEngine:
         )
         self._autolearn_min_prob = float(getattr(config, 'autolearn_min_prob', 0.55))
         self._autolearn_enabled = bool(getattr(config, 'autolearn_enabled', True))
+        # Umbrales de señales: constantes durante toda la ejecucion
+        signals_cfg = getattr(config, "signals", None)
+        self._min_payout = getattr(signals_cfg, "min_payout", 0.75)
+        self._min_volatility = getattr(signals_cfg, "min_volatility", 0.0)
+        self._min_score = getattr(signals_cfg, "min_signal_score", 0.55)
+        self._min_payout_inv = 1.0 / max(1e-6, 1.0 - self._min_payout)
 
 
 
@@ -52,20 +65,20 @@ class DecisionEngine:
         collector: MarketCollector,
         asset: str,
         payout: float,
+        now: Optional[float] = None,
     ) -> Tuple[Optional[Decision], Optional[Dict[str, Any]]]:
-        snapshot = collector.get_snapshot(asset)
-        candles_m1 = list(snapshot.get("m1", []))
+        snapshot = collector.get_snapshot(asset, now=now)
+        candles_m1 = snapshot.get("m1", [])
         if len(candles_m1) < 3:
             return None, None
 
-        trend_data = snapshot.get("trend", {})
-        range_data = snapshot.get("range", {})
+        trend_data: TrendBias = snapshot["trend"]
+        range_data: RangeBounds = snapshot["range"]
         volatility = float(snapshot.get("volatility", 0.0))
 
-        signals_cfg = getattr(self.config, "signals", None)
-        min_payout = getattr(signals_cfg, "min_payout", 0.75)
-        min_volatility = getattr(signals_cfg, "min_volatility", 0.0)
-        min_score = getattr(signals_cfg, "min_signal_score", 0.55)
+        min_payout = self._min_payout
+        min_volatility = self._min_volatility
+        min_score = self._min_score
 
         regime = "trend" if self._in_trend(trend_data) else "range"
         decision_context = self._build_decision_context(
@@ -81,27 +94,20 @@ class DecisionEngine:
         if volatility < min_volatility:
             return None, decision_context
 
-        candidates: List[Decision] = []
-
+        # Un solo candidato por régimen: no hace falta lista ni max()
         if regime == "trend":
-            candidate = self._trend_candidate(
+            best = self._trend_candidate(
                 asset, candles_m1, trend_data, payout, volatility
             )
-            if candidate:
-                candidates.append(candidate)
         else:
-            candidate = self._range_candidate(
+            best = self._range_candidate(
                 asset, candles_m1, range_data, payout, volatility
             )
-            if candidate:
-                candidates.append(candidate)
 
-        if not candidates:
-            return None, decision_context
-
-        best = max(candidates, key=lambda decision: decision.score)
-        if best.score < min_score:
+        if best is None or best.score < min_score:
             return None, decision_context
+        if best.logic is not None:
+            best.logic["last3_candles"] = self._compact_last3(candles_m1)
 
         final_context = dict(decision_context or {})
         final_context.setdefault("decision", {})
@@ -135,11 +141,11 @@ class DecisionEngine:
         self,
         asset: str,
         candles_m1: List[Mapping[str, float]],
-        trend_m5: Mapping[str, float],
+        trend_m5: TrendBias,
         payout: float,
         volatility: float,
     ) -> Optional[Decision]:
-        bias = float(trend_m5.get("bias", 0.0))
+        bias = trend_m5.bias
         if bias == 0.0:
             return None
 
@@ -163,18 +169,8 @@ class DecisionEngine:
             candles=candles_m1[-3:],
         )
 
-        # ?? Snapshot de lógica para contexto
-        last3 = candles_m1[-3:]
-        last3_compact = [
-            {
-                "open": float(c.get("open", 0.0)),
-                "close": float(c.get("close", 0.0)),
-                "high": float(c.get("max", c.get("high", 0.0))),
-                "low": float(c.get("min", c.get("low", 0.0))),
-            }
-            for c in last3
-        ]
-
+        # ?? Snapshot de lógica para contexto (last3_candles se agrega en evaluate
+        # solo para el candidato ganador)
         logic: Dict[str, Any] = {
             "regime": "trend",
             "pattern": pattern,
@@ -182,8 +178,7 @@ class DecisionEngine:
             "payout": payout,
             "volatility": volatility,
             "bias": bias,
-            "trend_state": trend_m5.get("state", ""),
-            "last3_candles": last3_compact,
+            "trend_state": trend_m5.state,
         }
 
         return Decision(
@@ -200,14 +195,11 @@ class DecisionEngine:
         self,
         asset: str,
         candles_m1: List[Mapping[str, float]],
-        range_bounds: Mapping[str, float],
+        range_bounds: RangeBounds,
         payout: float,
         volatility: float,
     ) -> Optional[Decision]:
-        lower = float(range_bounds.get("lower", 0.0))
-        upper = float(range_bounds.get("upper", 0.0))
-        width = float(range_bounds.get("width", 0.0))
-        tolerance = float(range_bounds.get("tolerance", width * 0.15))
+        lower, upper, width, _, _, tolerance = range_bounds
         if width <= 0:
             return None
 
@@ -238,17 +230,6 @@ class DecisionEngine:
         )
         reason = reason or "range reversal"
 
-        last3 = candles_m1[-3:]
-        last3_compact = [
-            {
-                "open": float(c.get("open", 0.0)),
-                "close": float(c.get("close", 0.0)),
-                "high": float(c.get("max", c.get("high", 0.0))),
-                "low": float(c.get("min", c.get("low", 0.0))),
-            }
-            for c in last3
-        ]
-
         logic: Dict[str, Any] = {
             "regime": "range",
             "pattern": pattern,
@@ -260,7 +241,6 @@ class DecisionEngine:
             "range_width": width,
             "tolerance": tolerance,
             "last_close": last_close,
-            "last3_candles": last3_compact,
         }
 
         return Decision(
@@ -276,10 +256,8 @@ class DecisionEngine:
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
-    def _in_trend(self, trend_data: Mapping[str, Any]) -> bool:
-        bias = float(trend_data.get("bias", 0.0))
-        state = trend_data.get("state", "range")
-        return bias != 0.0 or state in {"trend_up", "trend_down"}
+    def _in_trend(self, trend_data: TrendBias) -> bool:
+        return trend_data.bias != 0.0 or trend_data.state in {"trend_up", "trend_down"}
 
     def _compute_signal_score(
         self,
@@ -290,12 +268,7 @@ class DecisionEngine:
         bias: float,
         candles: List[Mapping[str, float]],
     ) -> float:
-        base_map = {
-            "engulfing": 0.7,
-            "momentum": 0.65,
-            "reversal": 0.6,
-        }
-        base = base_map.get(pattern, 0.55)
+        base = _BASE_SCORE_MAP.get(pattern, 0.55)
 
         last = candles[-1]
         open_ = float(last.get("open", 0.0))
@@ -307,12 +280,9 @@ class DecisionEngine:
         momentum_ratio = min(body / range_, 1.0)
         momentum_score = 0.2 * momentum_ratio
 
-        signals_cfg = getattr(self.config, "signals", None)
-        min_payout = getattr(signals_cfg, "min_payout", 0.75)
-        payout_norm = max(
-            0.0, min(1.0, (payout - min_payout) / max(1e-6, 1.0 - min_payout))
+        payout_score = 0.1 * max(
+            0.0, min(1.0, (payout - self._min_payout) * self._min_payout_inv)
         )
-        payout_score = 0.1 * payout_norm
 
         bias_score = 0.0
         if regime == "trend":
@@ -330,13 +300,8 @@ class DecisionEngine:
         regime: str,
         volatility: float,
     ) -> Dict[str, Any]:
-        candles_m1: List[Mapping[str, Any]] = list(snapshot.get("m1", []))
-        candles_dicts = [dict(c) for c in candles_m1]
-
-        fibo_sample = candles_dicts[-50:]
-        atr_sample = candles_dicts[-10:]
-        fibo_levels = fibo_zones(fibo_sample) if fibo_sample else {}
-        atr_value = atr_micro(atr_sample) if atr_sample else 0.0
+        candles_m1: Sequence[Mapping[str, Any]] = snapshot.get("m1", [])
+        zones, atr_value = self._micro_structure(candles_m1)
         bollinger = self._compute_bollinger_context(candles_m1)
 
         context = {
@@ -345,14 +310,25 @@ class DecisionEngine:
             "regime": regime,
             "volatility": volatility,
             "atr_micro": atr_value,
-            "fibo_zones": fibo_levels,
+            "fibo_zones": zones,
             "pivots": snapshot.get("pivots", {}),
             "bollinger": bollinger,
-            "trend": snapshot.get("trend", {}),
-            "range": snapshot.get("range", {}),
+            # Dicts en el contexto: se persiste como JSON para autolearn
+            "trend": snapshot["trend"]._asdict(),
+            "range": snapshot["range"]._asdict(),
             "micro_range": snapshot.get("micro_range"),
             "timestamp": snapshot.get("timestamp"),
         }
+        # Velas del contexto desde el collector; get_candles por red solo si
+        # aun no hay historial suficiente (arranque en frio)
+        count = self._context_candle_count
+        if isinstance(candles_m1, CandleView) and count > 0 and len(candles_m1) >= count:
+            cols = candles_m1[-count:].columns
+            context["candles"] = candles_from_columns(
+                cols.time, cols.open, cols.high, cols.low, cols.close, cols.volume
+            )
+            context["candles_timeframe_sec"] = self._context_timeframe
+            context["candles_count"] = count
         context = attach_candles_to_context(
             api=self.api,
             context=context,
@@ -362,9 +338,47 @@ class DecisionEngine:
         )
         return context
 
+    @staticmethod
+    def _compact_last3(candles: Sequence[Mapping[str, Any]]) -> List[Dict[str, float]]:
+        last3 = candles[-3:]
+        if isinstance(last3, CandleView):
+            cols = last3.columns
+            return [
+                {"open": o, "close": c, "high": h, "low": l}
+                for o, c, h, l in zip(
+                    cols.open.tolist(),
+                    cols.close.tolist(),
+                    cols.high.tolist(),
+                    cols.low.tolist(),
+                )
+            ]
+        return [
+            {
+                "open": float(c.get("open", 0.0)),
+                "close": float(c.get("close", 0.0)),
+                "high": float(c.get("max", c.get("high", 0.0))),
+                "low": float(c.get("min", c.get("low", 0.0))),
+            }
+            for c in last3
+        ]
+
+    @staticmethod
+    def _micro_structure(
+        candles: Sequence[Mapping[str, Any]],
+    ) -> Tuple[Dict[str, float], float]:
+        """Fibo zones over the last 50 candles and micro ATR over the last 10."""
+
+        # fibo_zones/atr_micro solo leen: basta con los slices, sin copiar (las
+        # vistas de columnas van directo a los kernels)
+        fibo_sample = candles[-50:]
+        atr_sample = candles[-10:]
+        levels = fibo_zones(fibo_sample) if fibo_sample else {}
+        atr_value = atr_micro(atr_sample) if atr_sample else 0.0
+        return levels, atr_value
+
     def _compute_bollinger_context(
         self,
-        candles: List[Mapping[str, Any]],
+        candles: Sequence[Mapping[str, Any]],
         period: int = 20,
         std_multiplier: float = 2.0,
     ) -> Dict[str, Any]:
@@ -379,23 +393,16 @@ class DecisionEngine:
         if len(candles) < 2:
             return info
 
-        closes: List[float] = []
-        window = candles[-period:]
-        for candle in window:
-            close = candle.get("close")
-            if close is None:
-                continue
-            try:
-                closes.append(float(close))
-            except (TypeError, ValueError):
-                continue
-
-        if len(closes) < 2:
+        # Las velas ya llegan normalizadas a float desde el ingest; las listas
+        # sueltas se convierten una sola vez en el mismo helper del collector
+        closes = MarketCollector._extract_closes(candles[-period:])
+
+        if closes.shape[0] < 2:
             return info
 
-        mean = sum(closes) / len(closes)
-        variance = sum((value - mean) ** 2 for value in closes) / len(closes)
-        std = variance ** 0.5
+        # Una pasada vectorizada; std con ddof=0 como la formula original
+        mean = float(closes.mean())
+        std = float(closes.std())
         upper = mean + std_multiplier * std
         lower = mean - std_multiplier * std
         last_candle = candles[-1]
@@ -38,6 +38,35 @@ def fetch_candles(
     return candles
 
 
+def candles_from_columns(
+    times: Any,
+    opens: Any,
+    highs: Any,
+    lows: Any,
+    closes: Any,
+    volumes: Any,
+) -> List[Dict[str, Any]]:
+    """Same OHLCV layout as `fetch_candles`, built from numpy columns (oldest first)."""
+    return [
+        {
+            "timestamp": int(t),
+            "open": o,
+            "high": h,
+            "low": l,
+            "close": c,
+            "volume": v,
+        }
+        for t, o, h, l, c, v in zip(
+            times.tolist(),
+            opens.tolist(),
+            highs.tolist(),
+            lows.tolist(),
+            closes.tolist(),
+            volumes.tolist(),
+        )
+    ]
+
+
 def attach_candles_to_context(
     api: Any,
     context: Optional[Dict[str, Any]],
@@ -1,20 +1,57 @@
 import glob
-import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# orjson si esta instalado (mucho mas rapido); json estandar si no
+try:
+    from orjson import loads as _json_loads  # type: ignore
+except Exception:
+    from json import loads as _json_loads
+
+def _compact_event(evt):
+    # Solo lo que count_trades necesita: el context (con sus velas) no vuelve
+    # al proceso padre, cuyo unpickle costaba mas que el parseo en serie
+    ctx = evt.get("context") or {}
+    candles = ctx.get("candles")
+    outcome_real = evt.get("outcome_real", "")
+    return (
+        evt.get("trade_id"),
+        str(evt.get("status", "")).lower(),
+        outcome_real in ("WIN", "LOSS", "win", "loss"),
+        "candles" in ctx,
+        len(candles) if candles else 0,
+        str(evt.get("outcome_real", evt.get("result", ""))).lower(),
+    )
+
+
+def _parse_file(file):
+    events = []
+    # Un solo read por archivo; los loads aceptan bytes directamente
+    for line in Path(file).read_bytes().splitlines():
+        if not line.strip():
+            continue
+        try:
+            obj = _json_loads(line)
+        except ValueError:
+            continue
+        events.append(_compact_event(obj))
+    return events
+
+
 def load_all_events():
+    files = glob.glob("logs/trades_*.jsonl")
+    workers = min(os.cpu_count() or 1, len(files))
     events = []
-    for file in glob.glob("logs/trades_*.jsonl"):
-        with open(file, "r", encoding="utf-8") as f:
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    obj = json.loads(line)
-                except:
-                    continue
-                events.append(obj)
+    if workers <= 1:
+        # Un archivo (o un nucleo): arrancar procesos no compensa
+        for file in files:
+            events.extend(_parse_file(file))
+        return events
+    # Un proceso por archivo/nucleo; map conserva el orden de los archivos
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for part in pool.map(_parse_file, files):
+            events.extend(part)
     return events
 
 
@@ -22,13 +59,13 @@ def count_trades(events):
     open_map = {}
     close_map = {}
 
+    # Cada evento llega compacto desde _parse_file:
+    # (trade_id, status, condensado, tiene velas, n velas, outcome)
     for evt in events:
-        trade_id = evt.get("trade_id")
+        trade_id, status, condensed, has_candles, _, _ = evt
         if not trade_id:
             continue
 
-        status = str(evt.get("status", "")).lower()
-
         # sistemas OPEN/CLOSE tradicionales
         if status == "open":
             open_map[trade_id] = evt
@@ -38,66 +75,49 @@ def count_trades(events):
 
         else:
             # Caso: LOG condensado (OPEN + CLOSE en una sola línea)
-            outcome = evt.get("outcome_real", "")
-            if outcome in ("WIN","LOSS","win","loss"):
+            if condensed:
                 close_map[trade_id] = evt
-                if "candles" in evt.get("context", {}):
+                if has_candles:
                     open_map[trade_id] = evt
 
     total_events = len(events)
     total_open = len(open_map)
     total_close = len(close_map)
 
-    valid_pairs = []
-    missing_close = 0
-    missing_open = 0
-
-    for tid in set(list(open_map.keys()) + list(close_map.keys())):
-        if tid in open_map and tid in close_map:
-            valid_pairs.append(tid)
-        elif tid in open_map:
-            missing_close += 1
-        elif tid in close_map:
-            missing_open += 1
-
-    dataset_valid = []
-    for tid in valid_pairs:
-        evt_open = open_map[tid]
-        ctx = evt_open.get("context") or {}
-        candles = ctx.get("candles")
-
-        if not candles or len(candles) < 50:
-            continue
-
-        evt_close = close_map[tid]
-        outcome = str(evt_close.get("outcome_real", evt_close.get("result",""))).lower()
+    # Los mapas se arman antes (el ultimo evento de cada trade gana); el resto
+    # sale de una sola pasada sobre los OPEN, sin union de claves ni listas
+    valid_pairs = 0
+    wins = 0
+    losses = 0
 
-        if outcome not in ("win","loss"):
+    for tid, evt_open in open_map.items():
+        evt_close = close_map.get(tid)
+        if evt_close is None:
             continue
+        valid_pairs += 1
 
-        dataset_valid.append(tid)
+        if evt_open[4] < 50:
+            continue
 
-    wins = 0
-    losses = 0
-    for tid in dataset_valid:
-        evt_close = close_map[tid]
-        outcome = str(evt_close.get("outcome_real", evt_close.get("result",""))).lower()
+        outcome = evt_close[5]
         if outcome == "win":
             wins += 1
         elif outcome == "loss":
             losses += 1
 
+    dataset_valid = wins + losses
+
     return {
         "total_events": total_events,
         "total_open": total_open,
         "total_close": total_close,
-        "valid_pairs": len(valid_pairs),
-        "missing_open": missing_open,
-        "missing_close": missing_close,
-        "dataset_valid": len(dataset_valid),
+        "valid_pairs": valid_pairs,
+        "missing_open": total_close - valid_pairs,
+        "missing_close": total_open - valid_pairs,
+        "dataset_valid": dataset_valid,
         "wins": wins,
         "losses": losses,
-        "draws": len(dataset_valid) - wins - losses,
+        "draws": dataset_valid - wins - losses,
     }
 
 
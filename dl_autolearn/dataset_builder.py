@@ -1,47 +1,281 @@
 ﻿import glob
 import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 
-from .features import extract_numeric_features_from_context, normalize_candles
+# orjson si esta instalado (mucho mas rapido); json estandar si no
+try:
+    from orjson import loads as _json_loads  # type: ignore
+except Exception:
+    from json import loads as _json_loads
+
+# simdjson opcional: lectura bajo demanda de trade_id/status/resultado sin
+# construir el resto de la linea (context con velas, decision_context, ...)
+try:
+    import simdjson  # type: ignore
+except Exception:
+    simdjson = None
+
+from .features import (
+    DEFAULT_NUMERIC_FEATURE_KEYS,
+    FEATURES_VERSION,
+    fill_numeric_features,
+    normalize_candles,
+)
 
 
 LOG_PATTERN = "logs/trades_*.jsonl"
+# Directorio con candles.npy, features.npy, y.npy y meta.json
+DATASET_PATH = "logs/autolearn_dataset"
+# Las velas se guardan en float16 como desvio respecto de 1.0 (precios ya
+# normalizados por la media): el desvio conserva la precision que float16
+# perderia sobre el valor absoluto
+CANDLE_DTYPE = "float16"
+CANDLE_OFFSET = 1.0
 DEFAULT_CANDLE_COUNT = 120
+# Un proceso por nucleo para leer y parsear los logs (el parseo JSON es CPU)
+PARSE_WORKERS = os.cpu_count() or 1
+_TRADE_ID_KEY = b'"trade_id"'
+# Manifest del build incremental (dentro del directorio del dataset)
+SCAN_CACHE_NAME = "scan_cache.pkl"
+_SCAN_CACHE_VERSION = 2
+# Bytes previos al offset guardados para detectar archivos reescritos (log_doctor)
+_TAIL_CHECK = 64
+# Status tal como lo escriben los logs -> forma canonica (sin upper() por linea)
+_STATUS_NAMES = {"OPEN": "OPEN", "open": "OPEN", "CLOSE": "CLOSE", "close": "CLOSE"}
+
+
+def _sample_row(ctx: Dict[str, Any], candle_count: int) -> Optional[np.ndarray]:
+    """Feature row of an OPEN context, or None when it has too few candles."""
+    candles = ctx.get("candles") or []
+    if len(candles) < 5:
+        return None
+    split = candle_count * 5
+    row = np.empty(split + len(DEFAULT_NUMERIC_FEATURE_KEYS), dtype="float32")
+    # Las velas se normalizan directamente sobre la fila (sin tensor intermedio)
+    normalize_candles(candles, candle_count=candle_count, out=row[:split].reshape(candle_count, 5))
+    fill_numeric_features(ctx, row[split:])
+    return row
+
+
+def _line_fields(
+    parser: Any, line: bytes
+) -> Optional[Tuple[Any, str, int, Optional[Dict[str, Any]]]]:
+    """(trade_id, STATUS, close label, parsed dict) of one log line, or None.
+
+    With a simdjson parser only the read fields are materialised and no proxy
+    outlives this call (the parser is reused for the next line); the parsed
+    dict is only returned on the plain JSON path.
+    """
+    doc = parser.parse(line) if parser is not None else _json_loads(line)
+    get = getattr(doc, "get", None)
+    if get is None:
+        return None
+    trade_id = get("trade_id")
+    if not trade_id or not isinstance(trade_id, (str, int)):
+        return None
+    raw_status = get("status")
+    if isinstance(raw_status, str):
+        status = _STATUS_NAMES.get(raw_status) or raw_status.upper()
+    else:
+        status = ""
+    label = -1
+    if status == "CLOSE":
+        try:
+            label = _label_from_close(doc)
+        except ValueError:
+            label = -1
+    return trade_id, status, label, doc if parser is None else None
+
 
+def _scan_file(job: Tuple[str, int, int]) -> Dict[str, Any]:
+    """Summarise one JSONL log from byte *start* (top-level: picklable for workers).
 
-def _collect_events() -> Dict[str, List[Dict[str, Any]]]:
-    grouped: Dict[str, List[Dict[str, Any]]] = {}
-    for path in glob.glob(LOG_PATTERN):
-        file_path = Path(path)
-        with file_path.open("r", encoding="utf-8") as handle:
-            for line in handle:
-                line = line.strip()
-                if not line:
-                    continue
-                try:
-                    payload = json.loads(line)
-                except Exception:
-                    continue
-                trade_id = payload.get("trade_id")
-                if not trade_id:
-                    continue
-                grouped.setdefault(trade_id, []).append(payload)
-    return grouped
-
-
-def _pick_open_close(events: List[Dict[str, Any]]) -> Tuple[Dict[str, Any] | None, Dict[str, Any] | None]:
-    open_evt = None
-    close_evt = None
-    for evt in events:
-        status = str(evt.get("status", "")).upper()
-        if status == "OPEN" and open_evt is None:
-            open_evt = evt
+    Per trade_id only the first OPEN (as its feature row) and the last CLOSE
+    (as its label, -1 if unsupported) matter, so the summary is all the
+    dataset needs from the file and re-scanning lines already seen is harmless.
+    """
+    path, start, candle_count = job
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, "rb") as handle:
+        handle.seek(start)
+        blob = handle.read()
+
+    seen: Dict[str, None] = {}
+    opens: Dict[str, Optional[np.ndarray]] = {}
+    closes: Dict[str, int] = {}
+    parser = simdjson.Parser() if simdjson is not None else None
+    # Un solo read por archivo; los loads aceptan bytes directamente
+    for line in blob.splitlines():
+        # Filtro por bytes: lineas sin trade_id se descartan sin parsear
+        if _TRADE_ID_KEY not in line:
+            continue
+        try:
+            fields = _line_fields(parser, line)
+        except Exception:
+            continue
+        if fields is None:
+            continue
+        trade_id, status, label, payload = fields
+        seen[trade_id] = None
+        if status == "OPEN" and trade_id not in opens:
+            # Solo el primer OPEN de cada trade se materializa completo
+            # (orjson construye el context entero mas rapido que simdjson)
+            if payload is None:
+                payload = _json_loads(line)
+            opens[trade_id] = _sample_row(payload.get("context") or {}, candle_count)
         elif status == "CLOSE":
-            close_evt = evt
-    return open_evt, close_evt
+            closes[trade_id] = label
+
+    # Offset tras la ultima linea completa: una linea a medio escribir se relee
+    offset = start + blob.rfind(b"\n") + 1
+    with open(path, "rb") as handle:
+        tail_start = max(0, offset - _TAIL_CHECK)
+        handle.seek(tail_start)
+        tail = handle.read(offset - tail_start)
+    return {
+        "mtime": mtime,
+        "size": start + len(blob),
+        "offset": offset,
+        "tail": tail,
+        "seen": seen,
+        "opens": opens,
+        "closes": closes,
+    }
+
+
+def _merge_scan(entry: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    """Apply the scan of a file's appended bytes to its cached summary."""
+    entry["seen"].update(part["seen"])
+    opens = entry["opens"]
+    for trade_id, row in part["opens"].items():
+        opens.setdefault(trade_id, row)
+    entry["closes"].update(part["closes"])
+    for key in ("mtime", "size", "offset", "tail"):
+        entry[key] = part[key]
+    return entry
+
+
+def _scan_start(path: str, entry: Optional[Dict[str, Any]]) -> Optional[int]:
+    """None if *entry* is still current, its offset if the file only grew, else 0."""
+    if entry is None:
+        return 0
+    stat = os.stat(path)
+    if stat.st_mtime_ns == entry["mtime"] and stat.st_size == entry["size"]:
+        return None
+    offset = entry["offset"]
+    if stat.st_size < offset:
+        return 0
+    tail = entry["tail"]
+    with open(path, "rb") as handle:
+        handle.seek(offset - len(tail))
+        if handle.read(len(tail)) != tail:
+            return 0
+    return offset
+
+
+def _scan_cache_header(candle_count: int) -> Dict[str, Any]:
+    # Las filas cacheadas ya son features: dependen de las claves y de como
+    # se extraen, ademas de candle_count
+    return {
+        "version": _SCAN_CACHE_VERSION,
+        "candle_count": candle_count,
+        "feature_keys": tuple(DEFAULT_NUMERIC_FEATURE_KEYS),
+        "features_version": FEATURES_VERSION,
+    }
+
+
+def _load_scan_cache(out_dir: Path, candle_count: int) -> Dict[str, Dict[str, Any]]:
+    cache_path = out_dir / SCAN_CACHE_NAME
+    if not cache_path.exists():
+        return {}
+    try:
+        with cache_path.open("rb") as handle:
+            cache = pickle.load(handle)
+    except Exception:
+        return {}
+    header = _scan_cache_header(candle_count)
+    if any(cache.get(key) != value for key, value in header.items()):
+        return {}
+    return cache.get("files", {})
+
+
+def _scan_logs(out_dir: Path, candle_count: int, incremental: bool) -> List[Dict[str, Any]]:
+    """Per-file summaries in glob order; only new, grown or rewritten files are read."""
+    paths = glob.glob(LOG_PATTERN)
+    cached = _load_scan_cache(out_dir, candle_count) if incremental else {}
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    jobs: List[Tuple[str, int, int]] = []
+    for path in paths:
+        entry = cached.get(path)
+        start = _scan_start(path, entry)
+        if start is None:
+            entries[path] = entry
+        else:
+            if start > 0:
+                entries[path] = entry
+            jobs.append((path, start, candle_count))
+
+    workers = min(PARSE_WORKERS, len(jobs))
+    if workers <= 1:
+        # Un archivo (o un nucleo): arrancar procesos no compensa
+        parts = list(map(_scan_file, jobs))
+    else:
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_scan_file, jobs, chunksize=chunksize))
+
+    for (path, start, _), part in zip(jobs, parts):
+        entries[path] = _merge_scan(entries[path], part) if start > 0 else part
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with (out_dir / SCAN_CACHE_NAME).open("wb") as handle:
+        cache = {**_scan_cache_header(candle_count), "files": entries}
+        pickle.dump(cache, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    print(f"[dataset_builder] Logs leidos: {len(jobs)} de {len(paths)}")
+    return [entries[path] for path in paths]
+
+
+def _candle_offsets(candle_count: int) -> np.ndarray:
+    # Fila [o, h, l, c, v] * candle_count: el volumen (log1p) no lleva desvio
+    return np.tile(
+        np.array([CANDLE_OFFSET] * 4 + [0.0], dtype="float32"), candle_count
+    )
+
+
+def load_dataset(
+    path: str = DATASET_PATH,
+    mmap_mode: str | None = "r",
+) -> Tuple[np.ndarray, np.ndarray, int, List[str]]:
+    """Return (X, y, candle_count, feature_names) with X in float32.
+
+    The float16 candle block is read through mmap and dequantised in one pass;
+    y stays memory-mapped.
+    """
+    dataset = Path(path)
+    if dataset.suffix == ".npz":
+        # Formato anterior: un solo .npz
+        data = np.load(dataset, allow_pickle=True)
+        return data["X"], data["y"], int(data["candle_count"]), list(data["feature_names"])
+
+    meta = json.loads((dataset / "meta.json").read_text(encoding="utf-8"))
+    candle_count = int(meta["candle_count"])
+    y = np.load(dataset / "y.npy", mmap_mode=mmap_mode)
+    candles_q = np.load(dataset / "candles.npy", mmap_mode=mmap_mode)
+    features = np.load(dataset / "features.npy", mmap_mode=mmap_mode)
+
+    split = candles_q.shape[1]
+    X = np.empty((candles_q.shape[0], split + features.shape[1]), dtype="float32")
+    X[:, :split] = candles_q
+    X[:, :split] += _candle_offsets(candle_count)
+    X[:, split:] = features
+    return X, y, candle_count, list(meta["feature_names"])
 
 
 def _label_from_close(close_evt: Dict[str, Any]) -> int:
@@ -61,60 +295,78 @@ def _label_from_close(close_evt: Dict[str, Any]) -> int:
 
 def build_dataset(
     candle_count: int = DEFAULT_CANDLE_COUNT,
-    output_path: str = "logs/autolearn_dataset.npz",
+    output_path: str = DATASET_PATH,
+    incremental: bool = True,
 ) -> None:
-    events_by_id = _collect_events()
+    out_dir = Path(output_path)
+    scans = _scan_logs(out_dir, candle_count, incremental)
 
-    X_samples: List[np.ndarray] = []
-    y_samples: List[int] = []
-    feature_names: List[str] = []
+    # Orden de aparicion de cada trade; primer OPEN y ultimo CLOSE entre archivos
+    order: Dict[str, None] = {}
+    opens: Dict[str, Optional[np.ndarray]] = {}
+    closes: Dict[str, int] = {}
+    for scan in scans:
+        order.update(scan["seen"])
+        for trade_id, row in scan["opens"].items():
+            opens.setdefault(trade_id, row)
+        closes.update(scan["closes"])
 
-    for trade_id, events in events_by_id.items():
-        open_evt, close_evt = _pick_open_close(events)
-        if open_evt is None or close_evt is None:
-            continue
+    # Como mucho una muestra por trade: X se reserva una sola vez
+    feature_names: List[str] = list(DEFAULT_NUMERIC_FEATURE_KEYS)
+    capacity = len(order)
+    split = candle_count * 5
+    X = np.empty((capacity, split + len(feature_names)), dtype="float32")
+    y_arr = np.empty(capacity, dtype="int64")
+    n_samples = 0
 
-        try:
-            label = _label_from_close(close_evt)
-        except ValueError:
+    for trade_id in order:
+        row = opens.get(trade_id)
+        label = closes.get(trade_id, -1)
+        if row is None or label < 0:
             continue
+        X[n_samples] = row
+        y_arr[n_samples] = label
+        n_samples += 1
 
-        ctx = open_evt.get("context") or {}
-        candles = ctx.get("candles") or []
-        if len(candles) < 5:
-            continue
-
-        candle_tensor = normalize_candles(candles, candle_count=candle_count)
-        candles_flat = candle_tensor.reshape(-1)
-
-        numeric_vec, names = extract_numeric_features_from_context(ctx)
-        if not feature_names:
-            feature_names = names
-
-        sample_vec = np.concatenate([candles_flat, numeric_vec], axis=0)
-        X_samples.append(sample_vec.astype("float32"))
-        y_samples.append(int(label))
-
-    if not X_samples:
+    if n_samples == 0:
         raise RuntimeError(
             "No samples generated. Confirm context['candles'] is being logged."
         )
 
-    X = np.vstack(X_samples).astype("float32")
-    y_arr = np.array(y_samples, dtype="int64")
+    X = X[:n_samples]
+    y_arr = y_arr[:n_samples]
 
-    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
-    np.savez(
-        output_path,
-        X=X,
-        y=y_arr,
-        feature_names=np.array(feature_names),
-        candle_count=int(candle_count),
-    )
+    # .npy sueltos en vez de .npz: se leen con mmap sin descomprimir
+    candles_q = (X[:, :split] - _candle_offsets(candle_count)).astype(CANDLE_DTYPE)
+    np.save(out_dir / "candles.npy", candles_q)
+    np.save(out_dir / "features.npy", X[:, split:])
+    np.save(out_dir / "y.npy", y_arr)
+    meta = {
+        "feature_names": feature_names,
+        "candle_count": int(candle_count),
+        "candles_dtype": CANDLE_DTYPE,
+        "candles_offset": CANDLE_OFFSET,
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
 
     print(f"[dataset_builder] Dataset saved to {output_path}")
     print(f"[dataset_builder] X shape={X.shape}, y shape={y_arr.shape}")
 
 
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Construye el dataset de AutoLearning desde los logs JSONL."
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignorar la cache de escaneo y releer todos los logs.",
+    )
+    args = parser.parse_args()
+    build_dataset(incremental=not args.full)
+
+
 if __name__ == "__main__":
-    build_dataset()
+    main()
@@ -1,7 +1,14 @@
-﻿from typing import Any, Dict, List, Tuple
+﻿import math
+from typing import Any, Callable, Dict, List, Tuple
 
 import numpy as np
 
+# Numba opcional: sin el, la normalizacion usa las operaciones vectoriales de NumPy
+try:
+    from numba import njit  # type: ignore
+except Exception:
+    njit = None
+
 
 DEFAULT_NUMERIC_FEATURE_KEYS: List[str] = [
     "payout",
@@ -18,6 +25,10 @@ DEFAULT_NUMERIC_FEATURE_KEYS: List[str] = [
     "micro_range_flag",
 ]
 
+# Subir al cambiar como se calcula alguna feature: invalida las filas ya
+# extraidas que dataset_builder guarda en su cache de escaneo
+FEATURES_VERSION = 1
+
 
 def _safe_get(data: Dict[str, Any], *keys: str, default: float = 0.0) -> float:
     current: Any = data
@@ -51,6 +62,54 @@ def _bollinger_extreme(ctx: Dict[str, Any]) -> float:
     return 0.0
 
 
+def _path_getter(*keys: str) -> Callable[[Dict[str, Any]], float]:
+    return lambda ctx: _safe_get(ctx, *keys, default=0.0)
+
+
+def _micro_range_flag(ctx: Dict[str, Any]) -> float:
+    return 1.0 if bool(ctx.get("micro_range")) else 0.0
+
+
+def _missing_feature(ctx: Dict[str, Any]) -> float:
+    return 0.0
+
+
+# Extractor por feature, resuelto una vez al importar (sin if/elif por clave)
+_EXTRACTORS: Dict[str, Callable[[Dict[str, Any]], float]] = {
+    "payout": _path_getter("payout"),
+    "volatility": _path_getter("volatility"),
+    "atr_micro": _path_getter("atr_micro"),
+    "trend_bias": _path_getter("trend", "bias"),
+    "trend_slope": _path_getter("trend", "ema_slope"),
+    "trend_spread": _path_getter("trend", "spread"),
+    "range_width": _path_getter("range", "width"),
+    "range_tolerance": _path_getter("range", "tolerance"),
+    "bollinger_std": _path_getter("bollinger", "std"),
+    "bollinger_width": _bollinger_width,
+    "bollinger_extreme": _bollinger_extreme,
+    "micro_range_flag": _micro_range_flag,
+}
+
+_DEFAULT_EXTRACTORS: Tuple[Callable[[Dict[str, Any]], float], ...] = tuple(
+    _EXTRACTORS[key] for key in DEFAULT_NUMERIC_FEATURE_KEYS
+)
+
+
+def _extractors_for(feature_keys: List[str] | None) -> Tuple[Callable[[Dict[str, Any]], float], ...]:
+    if feature_keys is None or feature_keys is DEFAULT_NUMERIC_FEATURE_KEYS:
+        return _DEFAULT_EXTRACTORS
+    return tuple(_EXTRACTORS.get(key, _missing_feature) for key in feature_keys)
+
+
+def fill_numeric_features(
+    ctx: Dict[str, Any],
+    out: np.ndarray,
+    feature_keys: List[str] | None = None,
+) -> None:
+    """Write the numeric features of *ctx* into *out* (e.g. a row of the dataset matrix)."""
+    out[:] = [fn(ctx) for fn in _extractors_for(feature_keys)]
+
+
 def extract_numeric_features_from_context(
     ctx: Dict[str, Any],
     feature_keys: List[str] | None = None,
@@ -59,70 +118,95 @@ def extract_numeric_features_from_context(
     if feature_keys is None:
         feature_keys = DEFAULT_NUMERIC_FEATURE_KEYS
 
-    mapping = {
-        "payout": ("payout",),
-        "volatility": ("volatility",),
-        "atr_micro": ("atr_micro",),
-        "trend_bias": ("trend", "bias"),
-        "trend_slope": ("trend", "ema_slope"),
-        "trend_spread": ("trend", "spread"),
-        "range_width": ("range", "width"),
-        "range_tolerance": ("range", "tolerance"),
-        "bollinger_std": ("bollinger", "std"),
-    }
-
-    values: List[float] = []
-    used_names: List[str] = []
-
-    for key in feature_keys:
-        if key == "bollinger_width":
-            values.append(float(_bollinger_width(ctx)))
-        elif key == "bollinger_extreme":
-            values.append(float(_bollinger_extreme(ctx)))
-        elif key == "micro_range_flag":
-            values.append(1.0 if bool(ctx.get("micro_range")) else 0.0)
-        else:
-            path = mapping.get(key)
-            if path is None:
-                values.append(0.0)
-            else:
-                values.append(_safe_get(ctx, *path, default=0.0))
-        used_names.append(key)
-
-    return np.array(values, dtype="float32"), used_names
+    values = np.empty(len(feature_keys), dtype="float32")
+    fill_numeric_features(ctx, values, feature_keys)
+    return values, list(feature_keys)
+
+
+def _candles_to_array(candles: Any) -> np.ndarray:
+    """OHLCV rows ``(N, 5)`` from candle dicts, ``[o, h, l, c, v]`` rows or an array.
+
+    Rows and arrays convert in one NumPy call; dicts need the per-key lookups.
+    """
+    if isinstance(candles, np.ndarray) or not isinstance(candles[0], dict):
+        return np.asarray(candles, dtype="float32")[:, :5]
+    return np.array(
+        [
+            (
+                float(c.get("open", 0.0)),
+                float(c.get("high", 0.0)),
+                float(c.get("low", 0.0)),
+                float(c.get("close", 0.0)),
+                float(c.get("volume", 0.0)),
+            )
+            for c in candles
+        ],
+        dtype="float32",
+    )
 
 
 def normalize_candles(
     candles: List[Dict[str, Any]],
     candle_count: int,
+    out: np.ndarray | None = None,
 ) -> np.ndarray:
-    """Normalize the last N OHLCV candles into a tensor of shape [N, 5]."""
-    if not candles:
-        return np.zeros((candle_count, 5), dtype="float32")
+    """Normalize the last N OHLCV candles into a tensor of shape [N, 5].
+
+    Accepts candle dicts (log format) or ``[open, high, low, close, volume]`` rows.
+    *out* (float32, shape ``[N, 5]``) is filled in place instead of allocating,
+    e.g. a view over a row of the dataset matrix.
+    """
+    if out is None:
+        out = np.zeros((candle_count, 5), dtype="float32")
+    else:
+        out.fill(0.0)
+
+    if len(candles) == 0:
+        return out
 
     if len(candles) > candle_count:
         candles = candles[-candle_count:]
 
-    if len(candles) < candle_count:
-        pad = candle_count - len(candles)
-        filler = [{"open": 0, "high": 0, "low": 0, "close": 0, "volume": 0} for _ in range(pad)]
-        candles = filler + candles
+    # Una sola conversion; el relleno (velas en cero) queda al inicio
+    out[candle_count - len(candles):] = _candles_to_array(candles)
 
-    opens = np.array([float(c.get("open", 0.0)) for c in candles], dtype="float32")
-    highs = np.array([float(c.get("high", 0.0)) for c in candles], dtype="float32")
-    lows = np.array([float(c.get("low", 0.0)) for c in candles], dtype="float32")
-    closes = np.array([float(c.get("close", 0.0)) for c in candles], dtype="float32")
-    volumes = np.array([float(c.get("volume", 0.0)) for c in candles], dtype="float32")
+    _normalize_inplace(out)
+    return out
 
-    mean_close = float(np.mean(closes)) or 1.0
-    if mean_close == 0:
-        mean_close = 1.0
 
-    opens /= mean_close
-    highs /= mean_close
-    lows /= mean_close
-    closes /= mean_close
-    volumes = np.log1p(np.maximum(volumes, 0.0))
+def _normalize_numpy(out: np.ndarray) -> None:
+    mean_close = float(np.mean(out[:, 3])) or 1.0
+
+    # OHLC en una sola division; volumen en log in-place
+    out[:, :4] /= mean_close
+    volumes = out[:, 4]
+    np.maximum(volumes, 0.0, out=volumes)
+    np.log1p(volumes, out=volumes)
 
-    stacked = np.stack([opens, highs, lows, closes, volumes], axis=1)
-    return stacked.astype("float32")
+
+def _normalize_kernel(out: np.ndarray) -> None:
+    """Same as ``_normalize_numpy`` fused into one pass over the rows."""
+
+    n = out.shape[0]
+    if n == 0:
+        return
+    total = 0.0
+    for i in range(n):
+        total += out[i, 3]
+    mean_close = total / n
+    if mean_close == 0.0:
+        mean_close = 1.0
+    for i in range(n):
+        out[i, 0] /= mean_close
+        out[i, 1] /= mean_close
+        out[i, 2] /= mean_close
+        out[i, 3] /= mean_close
+        volume = out[i, 4]
+        out[i, 4] = math.log1p(volume if volume > 0.0 else 0.0)
+
+
+if njit is not None:
+    # Firma explicita: se compila (o carga del cache) al importar, no en el primer trade
+    _normalize_inplace = njit("void(float32[:, :])", cache=True, fastmath=True)(_normalize_kernel)
+else:
+    _normalize_inplace = _normalize_numpy
@@ -3,6 +3,45 @@ import json
 from typing import Dict, Any, List
 from dataclasses import dataclass
 
+import numpy as np
+
+# orjson si esta instalado (mucho mas rapido); json estandar si no
+try:
+    from orjson import dumps as _orjson_dumps, loads as _json_loads  # type: ignore
+except Exception:
+    _orjson_dumps = None
+    _json_loads = json.loads
+
+
+def _dumps_line(ev: Dict[str, Any]) -> bytes:
+    """Una linea JSONL en bytes UTF-8 (orjson ya emite UTF-8 sin escapar)."""
+    if _orjson_dumps is not None:
+        return _orjson_dumps(ev) + b"\n"
+    return (json.dumps(ev, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _event_sort_key(ev: Dict[str, Any]) -> float:
+    return ev.get("timestamp") or ev.get("open_time") or 0.0
+
+
+def _sort_events(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Eventos ordenados por timestamp (estable, igual que list.sort).
+
+    Las claves se extraen una vez a un float64 y se ordenan con argsort en C;
+    si algun timestamp no es numerico se usa el sort de Python de siempre.
+    """
+    try:
+        keys = np.fromiter(
+            (float(_event_sort_key(ev)) for ev in events),
+            dtype=np.float64,
+            count=len(events),
+        )
+    except (TypeError, ValueError):
+        return sorted(events, key=_event_sort_key)
+    order = np.argsort(keys, kind="stable")
+    return [events[i] for i in order.tolist()]
+
+
 # Directorio base de logs
 LOG_DIR = Path("logs")
 
@@ -19,16 +58,16 @@ class RepairStats:
 def load_events(path: Path) -> List[Dict[str, Any]]:
     """Carga todos los eventos JSONL de un archivo."""
     events: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                events.append(json.loads(line))
-            except json.JSONDecodeError:
-                # No revienta: solo avisa y sigue
-                print(f"[WARN] Línea inválida en {path}: {line[:120]}")
+    for line in path.read_bytes().splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            events.append(_json_loads(line))
+        except ValueError:
+            # No revienta: solo avisa y sigue
+            text = line.decode("utf-8", errors="replace")
+            print(f"[WARN] Línea inválida en {path}: {text[:120]}")
     return events
 
 
@@ -186,7 +225,7 @@ def repair_file(path: Path, stats: RepairStats, dry_run: bool = False) -> None:
         return
 
     # Ordenamos por timestamp antes de guardar
-    new_events.sort(key=lambda e: e.get("timestamp") or e.get("open_time") or 0.0)
+    new_events = _sort_events(new_events)
 
     if dry_run:
         print(f"  → DRY RUN: se repararían {stats.repaired_trades} trades (acumulado). NO se escribió archivo.")
@@ -197,9 +236,8 @@ def repair_file(path: Path, stats: RepairStats, dry_run: bool = False) -> None:
     path.rename(backup_path)
 
     # Escribimos el archivo reparado con el mismo nombre original
-    with path.open("w", encoding="utf-8") as f:
-        for ev in new_events:
-            f.write(json.dumps(ev, ensure_ascii=False) + "\n")
+    with path.open("wb") as f:
+        f.writelines(_dumps_line(ev) for ev in new_events)
 
     print(f"  → Reparados {stats.repaired_trades} trades (acumulado).")
     print(f"    Archivo sobrescrito. Backup en: {backup_path.name}")
@@ -1,37 +1,118 @@
-﻿from dataclasses import dataclass
+﻿import os
+import sys
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List
+from typing import Any, List
 
 import joblib
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.base import ClassifierMixin
+
+# treelite + tl2cgen opcionales: compilan los arboles a una libreria nativa
+# junto al .joblib; sin ellos se predice con sklearn como siempre
+try:
+    import treelite  # type: ignore
+except Exception:
+    treelite = None
+
+try:
+    import tl2cgen  # type: ignore
+except Exception:
+    tl2cgen = None
+
+NATIVE_LIB_SUFFIX = ".dll" if sys.platform == "win32" else ".so"
+_NATIVE_TOOLCHAIN = "msvc" if sys.platform == "win32" else "gcc"
+
+
+def _native_lib_paths(path: str) -> List[Path]:
+    """Compiled predictors saved next to the model file."""
+    model_path = Path(path)
+    return sorted(model_path.parent.glob(f"{model_path.stem}.*{NATIVE_LIB_SUFFIX}"))
 
 
 @dataclass
 class AutoLearnModel:
     candle_count: int
     feature_names: List[str]
-    classifier: RandomForestClassifier
+    # HistGradientBoosting (train.py); modelos RandomForest viejos siguen cargando
+    classifier: ClassifierMixin
+    # tl2cgen.Predictor cargado desde la libreria nativa (no se serializa)
+    predictor: Any = field(default=None, repr=False, compare=False)
 
     def predict_proba(self, X: np.ndarray) -> np.ndarray:
         """Return P(win) for each row in X."""
+        if self.predictor is not None:
+            # Recorrido de arboles en C: sin el overhead por llamada de sklearn
+            X = np.asarray(X, dtype="float32")
+            proba = self.predictor.predict(tl2cgen.DMatrix(X))
+            return proba.reshape(len(X), -1)[:, -1]
         proba = self.classifier.predict_proba(X)
         return proba[:, 1]
 
+    def export_native(self, lib_path: Path) -> bool:
+        """Compile the classifier into a shared library with treelite/tl2cgen."""
+        if treelite is None or tl2cgen is None:
+            return False
+        try:
+            tl_model = treelite.sklearn.import_model(self.classifier)
+            tl2cgen.export_lib(
+                tl_model,
+                toolchain=_NATIVE_TOOLCHAIN,
+                libpath=str(lib_path),
+                params={"parallel_comp": os.cpu_count() or 1},
+            )
+        except Exception as exc:
+            print(f"[model] Native predictor not built: {exc}")
+            return False
+        return True
+
     def save(self, path: str) -> None:
+        model_path = Path(path)
+        # Nombre unico por guardado: un proceso con la libreria anterior ya
+        # cargada (dlopen la cachea por ruta, Windows bloquea el .dll) no
+        # choca con la nueva
+        lib_path = model_path.with_name(
+            f"{model_path.stem}.{time.time_ns()}{NATIVE_LIB_SUFFIX}"
+        )
         payload = {
             "candle_count": self.candle_count,
             "feature_names": self.feature_names,
             "classifier": self.classifier,
+            "native_lib": lib_path.name,
         }
-        Path(path).parent.mkdir(parents=True, exist_ok=True)
-        joblib.dump(payload, path)
+        model_path.parent.mkdir(parents=True, exist_ok=True)
+        # Sin compresion: permite cargar los arrays del modelo con mmap
+        joblib.dump(payload, path, compress=0)
+        for old_lib in _native_lib_paths(path):
+            try:
+                old_lib.unlink()
+            except OSError:
+                pass  # todavia cargada por otro proceso
+        self.export_native(lib_path)
 
     @classmethod
     def load(cls, path: str) -> "AutoLearnModel":
-        payload = joblib.load(path)
+        # Arrays de los arboles mapeados desde disco (solo lectura): carga
+        # inmediata y paginas compartidas entre procesos via page cache
+        payload = joblib.load(path, mmap_mode="r")
         return cls(
             candle_count=int(payload["candle_count"]),
             feature_names=list(payload["feature_names"]),
             classifier=payload["classifier"],
-        )
+            predictor=_load_native(path, payload.get("native_lib")),
+        )
+
+
+def _load_native(path: str, lib_name: str | None) -> Any:
+    """tl2cgen predictor saved with the model, or None if missing or unavailable."""
+    if tl2cgen is None or not lib_name:
+        return None
+    lib_path = Path(path).with_name(lib_name)
+    if not lib_path.exists():
+        return None
+    try:
+        # Un hilo: la inferencia es de una fila por decision
+        return tl2cgen.Predictor(str(lib_path), nthread=1)
+    except Exception:
+        return None
@@ -1,8 +1,10 @@
 import numpy as np
 from pathlib import Path
 
+from .dataset_builder import DATASET_PATH, load_dataset
 
-def preview_dataset(path="logs/autolearn_dataset.npz"):
+
+def preview_dataset(path=DATASET_PATH):
     print("\n=== TradingLions AutoLearning Dataset Preview ===\n")
 
     file = Path(path)
@@ -12,11 +14,8 @@ def preview_dataset(path="logs/autolearn_dataset.npz"):
         print("    python -m dl_autolearn.dataset_builder\n")
         return
 
-    data = np.load(path, allow_pickle=True)
-    X = data["X"]
-    y = data["y"]
-    feature_names = list(data["feature_names"])
-    candle_count = int(data["candle_count"])
+    # X/y mapeados desde disco: solo se leen las paginas que toca el reporte
+    X, y, candle_count, feature_names = load_dataset(path)
 
     print(f"Dataset cargado desde: {path}")
     print(f"Shape X (muestras, features): {X.shape}")
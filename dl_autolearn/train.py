@@ -1,25 +1,56 @@
-﻿from pathlib import Path
+﻿import os
+from pathlib import Path
 from typing import List, Tuple
 
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
+from sklearn.ensemble import HistGradientBoostingClassifier
 from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
 
+from .dataset_builder import DATASET_PATH, load_dataset
 from .model import AutoLearnModel
 
 
 def _load_dataset(path: str) -> Tuple[np.ndarray, np.ndarray, int, List[str]]:
-    data = np.load(path, allow_pickle=True)
-    X = data["X"].astype("float32")
-    y = data["y"].astype("int64")
-    candle_count = int(data["candle_count"])
-    feature_names = list(data["feature_names"])
+    X, y, candle_count, feature_names = load_dataset(path)
+    # Sin copia si ya vienen en el dtype; el split train/val materializa las filas
+    X = np.asarray(X, dtype="float32")
+    y = np.asarray(y, dtype="int64")
     return X, y, candle_count, feature_names
 
 
+def _make_classifier():
+    """GBDT por histogramas: entrena mucho mas rapido y pesa menos que el RandomForest.
+
+    ``AUTOLEARN_LGBM=1`` usa LightGBM si esta instalado.
+    """
+    if os.getenv("AUTOLEARN_LGBM", "0") == "1":
+        try:
+            from lightgbm import LGBMClassifier  # type: ignore
+        except Exception:
+            LGBMClassifier = None
+        if LGBMClassifier is not None:
+            return LGBMClassifier(
+                n_estimators=300,
+                learning_rate=0.05,
+                max_bin=255,
+                random_state=42,
+                verbose=-1,
+            )
+    # early_stopping="auto": se activa solo con datasets grandes (>10k), con
+    # pocos trades un 10% de validacion dejaria clases casi vacias
+    return HistGradientBoostingClassifier(
+        max_iter=300,
+        learning_rate=0.05,
+        max_bins=255,
+        early_stopping="auto",
+        validation_fraction=0.1,
+        random_state=42,
+    )
+
+
 def train_autolearn(
-    dataset_path: str = "logs/autolearn_dataset.npz",
+    dataset_path: str = DATASET_PATH,
     model_path: str = "dl_autolearn/autolearn_model.joblib",
 ) -> None:
     X, y, candle_count, feature_names = _load_dataset(dataset_path)
@@ -28,14 +59,7 @@ def train_autolearn(
         X, y, test_size=0.2, random_state=42, stratify=y
     )
 
-    clf = RandomForestClassifier(
-        n_estimators=200,
-        max_depth=None,
-        min_samples_split=4,
-        min_samples_leaf=2,
-        n_jobs=-1,
-        random_state=42,
-    )
+    clf = _make_classifier()
     clf.fit(X_train, y_train)
 
     y_pred = clf.predict(X_val)
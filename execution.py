@@ -2,9 +2,13 @@
 
 from __future__ import annotations
 
+import heapq
+import itertools
+import threading
 import time
 import winsound
-from typing import Any, Dict, Mapping, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Tuple
 
 from iqoptionapi.stable_api import IQ_Option  # type: ignore
 
@@ -12,6 +16,13 @@ from logger import TradeLogger
 from result_watcher import ResultWatcher
 
 
+def _beep() -> None:
+    try:
+        winsound.Beep(1500, 600)
+    except Exception:
+        pass
+
+
 class ExecutionEngine:
     """
     Maneja el ciclo de vida de UNA orden binaria OTC:
@@ -22,6 +33,7 @@ class ExecutionEngine:
 
     MAX_RETRIES = 3
     RETRY_DELAY = 0.3
+    RETRY_BACKOFF = 1.5
 
     def __init__(
         self,
@@ -35,6 +47,9 @@ class ExecutionEngine:
         self.logger = trade_logger or TradeLogger(config)  # config es BotConfig
         self.result_watcher = result_watcher
         self._active_order: Optional[Dict[str, Any]] = None
+        # Ordenes abiertas ordenadas por vencimiento: (expires_at, seq, order)
+        self._resolution_heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._resolution_seq = itertools.count()
         self._duration = getattr(self.config, "trade_duration", 1)
 
     def open_order(
@@ -62,7 +77,7 @@ class ExecutionEngine:
         opened = False
         order_id = None
 
-        for _ in range(self.MAX_RETRIES):
+        for attempt in range(self.MAX_RETRIES):
             try:
                 opened, order_id = self.api.buy(stake, asset, direction, self._duration)
             except Exception:
@@ -70,7 +85,9 @@ class ExecutionEngine:
 
             if opened and order_id is not None:
                 break
-            time.sleep(self.RETRY_DELAY)
+            # Espera solo entre intentos (no tras el ultimo), creciendo 1.5x
+            if attempt < self.MAX_RETRIES - 1:
+                time.sleep(self.RETRY_DELAY * (self.RETRY_BACKOFF ** attempt))
 
         if not opened or order_id is None:
             return None
@@ -118,23 +135,42 @@ class ExecutionEngine:
         order["timestamp"] = opened_at
 
         self._active_order = order
+        heapq.heappush(
+            self._resolution_heap,
+            (opened_at + float(self._duration) * 60.0, next(self._resolution_seq), order),
+        )
         self.logger.log_trade_open(order)
 
         if self.result_watcher is not None:
             try:
-                self.result_watcher.register_open_trade(dict(order))
+                # Vista de solo lectura: el watcher solo lee la orden, sin copiarla
+                self.result_watcher.register_open_trade(MappingProxyType(order))
             except Exception:
                 pass
 
-        try:
-            winsound.Beep(1500, 600)
-        except Exception:
-            pass
+        # Beep bloquea 600 ms: se emite en un hilo aparte y open_order vuelve ya
+        threading.Thread(target=_beep, daemon=True).start()
 
         return order
 
     def has_active_order(self) -> bool:
         return self._active_order is not None
 
+    def pop_expired(self, now: float) -> List[Dict[str, Any]]:
+        """Saca del heap las ordenes vencidas a ``now`` (la mas antigua primero)."""
+
+        heap = self._resolution_heap
+        expired: List[Dict[str, Any]] = []
+        while heap and heap[0][0] <= now:
+            expired.append(heapq.heappop(heap)[2])
+        return expired
+
+    def has_pending_resolutions(self) -> bool:
+        return bool(self._resolution_heap)
+
+    def clear_active(self) -> None:
+        self._active_order = None
+        self._resolution_heap.clear()
+
 
 __all__ = ["ExecutionEngine"]
@@ -2,12 +2,51 @@
 
 from __future__ import annotations
 
-from typing import Dict, List, Mapping, MutableSequence, Optional, Sequence, Tuple
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Kernels AOT (build_indicators_aot.py): si la extension existe reemplaza a los
+# kernels JIT; el primer tick no paga compilacion y, si trae todos los kernels,
+# ni siquiera se importa numba
+try:
+    import indicators_aot as _aot  # type: ignore
+except Exception:
+    _aot = None
 
 Number = float
 
+# Kernels en Python puro por nombre (build_indicators_aot.py compila estos)
+_PY_KERNELS: Dict[str, object] = {}
+# numba.njit, importado solo si algun kernel no viene del AOT (False: sin numba)
+_njit = None
+
+
+def _jit(func):
+    global _njit
+    _PY_KERNELS[func.__name__] = func
+    # Extensiones compiladas antes de un kernel nuevo lo dejan en JIT
+    compiled = getattr(_aot, func.__name__, None) if _aot is not None else None
+    if compiled is not None:
+        return compiled
+    if _njit is None:
+        # Numba opcional: sin el, los kernels corren como Python normal
+        try:
+            from numba import njit as _njit  # type: ignore
+        except Exception:
+            _njit = False
+    if not _njit:
+        return func
+    return _njit(cache=True, fastmath=True)(func)
+
 
 def _to_float(value: object, default: float = 0.0) -> float:
+    # Camino rapido: velas del broker ya traen float/int, sin montar el try
+    kind = type(value)
+    if kind is float:
+        return value
+    if kind is int:
+        return float(value)
     try:
         return float(value)
     except (TypeError, ValueError):
@@ -19,41 +58,91 @@ def ema(values: Sequence[float], period: int) -> Optional[float]:
 
     if period <= 0:
         raise ValueError("period must be positive")
-    if len(values) < 1:
+    prices = np.ascontiguousarray(values, dtype=np.float64)
+    if prices.shape[0] < 1:
         return None
+    return float(ema_last2_kernel(prices, period)[0])
 
-    multiplier = 2.0 / (period + 1.0)
-    ema_value = values[0]
-    for price in values[1:]:
-        ema_value = (price - ema_value) * multiplier + ema_value
-    return ema_value
 
+def ema_series(values: Sequence[float], period: int) -> np.ndarray:
+    """Return an EMA value for every point in the sequence (float64 array)."""
 
-def ema_series(values: Sequence[float], period: int) -> Sequence[float]:
-    """Return an EMA value for every point in the sequence."""
+    return ema_series_kernel(np.ascontiguousarray(values, dtype=np.float64), period)
 
-    if len(values) < 1:
-        return []
-    multiplier = 2.0 / (period + 1.0)
-    series: MutableSequence[float] = [values[0]]
-    for price in values[1:]:
-        series.append((price - series[-1]) * multiplier + series[-1])
-    return series
 
+def _high_low(candle: Mapping[str, Number]) -> Tuple[float, float]:
+    """(high, low) of a candle dict; see :func:`candle_ohlc`."""
 
-def true_ranges(candles: Sequence[Mapping[str, Number]]) -> Sequence[float]:
-    if len(candles) < 2:
-        return []
-    result: list[float] = []
-    prev_close = _to_float(candles[0].get("close", 0.0))
-    for candle in candles[1:]:
-        high = _to_float(candle.get("max", candle.get("high", 0.0)))
-        low = _to_float(candle.get("min", candle.get("low", 0.0)))
-        close = _to_float(candle.get("close", prev_close))
-        tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
-        result.append(tr)
-        prev_close = close
-    return result
+    try:
+        high, low = candle["max"], candle["min"]
+    except KeyError:
+        high = candle.get("max", candle.get("high", 0.0))
+        low = candle.get("min", candle.get("low", 0.0))
+    return _to_float(high), _to_float(low)
+
+
+def candle_ohlc(candle: Mapping[str, Number]) -> Tuple[float, float, float, float]:
+    """(open, high, low, close) of a candle dict.
+
+    Collector candles always carry the canonical open/max/min/close keys, so
+    they are read by plain subscript; the o/high/low/c aliases are only
+    resolved when one of them is missing.
+    """
+
+    try:
+        open_, high = candle["open"], candle["max"]
+        low, close = candle["min"], candle["close"]
+    except KeyError:
+        open_ = candle.get("open", candle.get("o", 0.0))
+        high = candle.get("max", candle.get("high", 0.0))
+        low = candle.get("min", candle.get("low", 0.0))
+        close = candle.get("close", candle.get("c", 0.0))
+    return _to_float(open_), _to_float(high), _to_float(low), _to_float(close)
+
+
+def _candle_columns(candles: object) -> Optional[object]:
+    """float64 columns of a column-backed candle window, or None for candle dicts.
+
+    Windows such as ``collector.CandleView`` expose ``columns`` with ``high``,
+    ``low`` and ``close`` arrays; the helpers below read them directly instead
+    of converting every candle dict again.
+    """
+
+    return getattr(candles, "columns", None)
+
+
+def _hlc_columns(
+    candles: Sequence[Mapping[str, Number]],
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """float64 high/low/close columns of candle dicts in a single pass.
+
+    A candle without close carries the previous close forward.
+    """
+
+    highs: List[float] = []
+    lows: List[float] = []
+    closes: List[float] = []
+    close = 0.0
+    for candle in candles:
+        high, low = _high_low(candle)
+        highs.append(high)
+        lows.append(low)
+        close = _to_float(candle.get("close", close))
+        closes.append(close)
+    return (
+        np.array(highs, dtype=np.float64),
+        np.array(lows, dtype=np.float64),
+        np.array(closes, dtype=np.float64),
+    )
+
+
+def true_ranges(candles: Sequence[Mapping[str, Number]]) -> np.ndarray:
+    """True range of every candle after the first (float64 array)."""
+
+    cols = _candle_columns(candles)
+    if cols is not None:
+        return true_ranges_kernel(cols.high, cols.low, cols.close)
+    return true_ranges_kernel(*_hlc_columns(candles))
 
 
 def atr(candles: Sequence[Mapping[str, Number]], period: int = 14) -> Optional[float]:
@@ -61,22 +150,202 @@ def atr(candles: Sequence[Mapping[str, Number]], period: int = 14) -> Optional[f
 
     if period <= 0:
         raise ValueError("period must be positive")
-    series = true_ranges(candles)
-    if not series:
-        return None
-    sample = series[-period:]
-    if not sample:
+    if len(candles) < 2:
         return None
-    return sum(sample) / len(sample)
+    cols = _candle_columns(candles)
+    if cols is not None:
+        return float(atr_kernel(cols.high, cols.low, cols.close, period))
+    highs, lows, closes = _hlc_columns(candles)
+    return float(atr_kernel(highs, lows, closes, period))
+
+
+@_jit
+def true_ranges_kernel(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """True ranges over float64 columns (``len - 1`` values, one per candle pair)."""
+
+    n = closes.shape[0]
+    if n < 2:
+        return np.empty(0, dtype=np.float64)
+    out = np.empty(n - 1, dtype=np.float64)
+    for i in range(1, n):
+        prev_close = closes[i - 1]
+        tr = highs[i] - lows[i]
+        up = abs(highs[i] - prev_close)
+        down = abs(lows[i] - prev_close)
+        if up > tr:
+            tr = up
+        if down > tr:
+            tr = down
+        out[i - 1] = tr
+    return out
+
+
+@_jit
+def atr_kernel(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int) -> float:
+    """Single-pass ATR over float64 columns (mean of the last *period* true ranges)."""
+
+    n = closes.shape[0]
+    if n < 2 or period <= 0:
+        return -1.0
+    start = n - period
+    if start < 1:
+        start = 1
+    total = 0.0
+    for i in range(start, n):
+        prev_close = closes[i - 1]
+        tr = highs[i] - lows[i]
+        up = abs(highs[i] - prev_close)
+        down = abs(lows[i] - prev_close)
+        if up > tr:
+            tr = up
+        if down > tr:
+            tr = down
+        total += tr
+    return total / (n - start)
+
+
+@_jit
+def ema_last2_kernel(values: np.ndarray, period: int) -> Tuple[float, float]:
+    """Last two points of ``ema_series`` (seeded at ``values[0]``) without the series."""
+
+    n = values.shape[0]
+    if n == 0:
+        return 0.0, 0.0
+    multiplier = 2.0 / (period + 1.0)
+    current = values[0]
+    previous = current
+    for i in range(1, n):
+        previous = current
+        current = (values[i] - current) * multiplier + current
+    return current, previous
+
+
+@_jit
+def ema_series_kernel(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA of every point of a float64 column, seeded at ``values[0]``."""
+
+    n = values.shape[0]
+    out = np.empty(n, dtype=np.float64)
+    if n == 0:
+        return out
+    multiplier = 2.0 / (period + 1.0)
+    current = values[0]
+    out[0] = current
+    for i in range(1, n):
+        current = (values[i] - current) * multiplier + current
+        out[i] = current
+    return out
+
+
+@_jit
+def momentum_kernel(closes: np.ndarray, lookback: int) -> float:
+    """``momentum_score`` over a float64 close column."""
+
+    n = closes.shape[0]
+    if lookback < 2 or n < lookback:
+        return 0.0
+    start = n - lookback
+    high = closes[start]
+    low = closes[start]
+    for i in range(start + 1, n):
+        if closes[i] > high:
+            high = closes[i]
+        if closes[i] < low:
+            low = closes[i]
+    amplitude = high - low
+    if amplitude == 0.0:
+        amplitude = 1e-9
+    return (closes[n - 1] - closes[start]) / amplitude
+
+
+@_jit
+def range_stats_kernel(highs: np.ndarray, lows: np.ndarray) -> Tuple[float, float]:
+    """Return (``range_width``, ``average_range``) of the given high/low columns."""
+
+    n = highs.shape[0]
+    if n == 0:
+        return 0.0, 0.0
+    top = highs[0]
+    bottom = lows[0]
+    total = 0.0
+    for i in range(n):
+        if highs[i] > top:
+            top = highs[i]
+        if lows[i] < bottom:
+            bottom = lows[i]
+        total += highs[i] - lows[i]
+    return top - bottom, total / n
+
+
+@_jit
+def range_bounds_kernel(
+    highs: np.ndarray, lows: np.ndarray, tolerance_pct: float
+) -> Tuple[float, float, float, float, float]:
+    """Padded range bounds: (lower, upper, raw_lower, raw_upper, padding).
+
+    Branch-free: when the padding exceeds half the width, lower and upper
+    collapse onto the midpoint through min/max instead of an ``if``.
+    """
+
+    raw_upper = highs[0]
+    raw_lower = lows[0]
+    for i in range(1, highs.shape[0]):
+        raw_upper = max(raw_upper, highs[i])
+        raw_lower = min(raw_lower, lows[i])
+    padding = (raw_upper - raw_lower) * min(max(tolerance_pct, 0.0), 1.0)
+    midpoint = (raw_lower + raw_upper) / 2.0
+    lower = min(raw_lower + padding, midpoint)
+    upper = max(raw_upper - padding, midpoint)
+    return lower, upper, raw_lower, raw_upper, padding
+
+
+def _true_ranges_numpy(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """Branch-free ``true_ranges_kernel`` with NumPy maximum reductions."""
+
+    if closes.shape[0] < 2:
+        return np.empty(0, dtype=np.float64)
+    high = highs[1:]
+    low = lows[1:]
+    prev_close = closes[:-1]
+    return np.maximum(np.maximum(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+
+
+def _atr_numpy(highs: np.ndarray, lows: np.ndarray, closes: np.ndarray, period: int) -> float:
+    """``atr_kernel`` over ``_true_ranges_numpy``."""
+
+    n = closes.shape[0]
+    if n < 2 or period <= 0:
+        return -1.0
+    # Solo las ultimas period + 1 velas intervienen en los ultimos period TR
+    start = max(n - period - 1, 0)
+    return float(_true_ranges_numpy(highs[start:], lows[start:], closes[start:]).mean())
+
+
+# Sin numba ni AOT los kernels quedan como bucles Python sobre ndarrays (acceso
+# por elemento lento): los de true range pasan a la version vectorial sin ramas
+if true_ranges_kernel is _PY_KERNELS["true_ranges_kernel"]:
+    true_ranges_kernel = _true_ranges_numpy
+if atr_kernel is _PY_KERNELS["atr_kernel"]:
+    atr_kernel = _atr_numpy
+
+
+def warm_up_kernels() -> None:
+    """Compile (or load from cache) the JIT kernels before the first tick."""
+
+    sample = np.ones(2, dtype=np.float64)
+    atr_kernel(sample, sample, sample, 1)
+    true_ranges_kernel(sample, sample, sample)
+    ema_last2_kernel(sample, 1)
+    ema_series_kernel(sample, 1)
+    momentum_kernel(sample, 2)
+    range_stats_kernel(sample, sample)
+    range_bounds_kernel(sample, sample, 0.5)
 
 
 def body_ratio(candle: Mapping[str, Number]) -> float:
     """Body size divided by total range (0-1)."""
 
-    open_ = _to_float(candle.get("open", candle.get("o", 0.0)))
-    close = _to_float(candle.get("close", candle.get("c", 0.0)))
-    high = _to_float(candle.get("max", candle.get("high", 0.0)))
-    low = _to_float(candle.get("min", candle.get("low", 0.0)))
+    open_, high, low, close = candle_ohlc(candle)
     full_range = max(high - low, 1e-9)
     return abs(close - open_) / full_range
 
@@ -84,10 +353,7 @@ def body_ratio(candle: Mapping[str, Number]) -> float:
 def wick_ratio(candle: Mapping[str, Number]) -> Tuple[float, float]:
     """Return (lower_wick_ratio, upper_wick_ratio)."""
 
-    open_ = _to_float(candle.get("open", candle.get("o", 0.0)))
-    close = _to_float(candle.get("close", candle.get("c", 0.0)))
-    high = _to_float(candle.get("max", candle.get("high", 0.0)))
-    low = _to_float(candle.get("min", candle.get("low", 0.0)))
+    open_, high, low, close = candle_ohlc(candle)
     lower = min(open_, close)
     upper = max(open_, close)
     range_ = max(high - low, 1e-9)
@@ -96,22 +362,48 @@ def wick_ratio(candle: Mapping[str, Number]) -> Tuple[float, float]:
     return lower_wick / range_, upper_wick / range_
 
 
+def _range_stats(candles: Sequence[Mapping[str, Number]]) -> Tuple[float, float]:
+    """(``range_width``, ``average_range``) of a non-empty candle sequence.
+
+    Column-backed windows go straight to the kernel; candle dicts are
+    reduced in a single pass without intermediate lists.
+    """
+
+    cols = _candle_columns(candles)
+    if cols is not None:
+        width, avg = range_stats_kernel(cols.high, cols.low)
+        return float(width), float(avg)
+    top = -float("inf")
+    bottom = float("inf")
+    total = 0.0
+    for candle in candles:
+        high, low = _high_low(candle)
+        if high > top:
+            top = high
+        if low < bottom:
+            bottom = low
+        total += high - low
+    return top - bottom, total / len(candles)
+
+
 def range_width(candles: Sequence[Mapping[str, Number]]) -> float:
     if not candles:
         return 0.0
-    highs = [_to_float(c.get("max", c.get("high", 0.0))) for c in candles]
-    lows = [_to_float(c.get("min", c.get("low", 0.0))) for c in candles]
-    return max(highs) - min(lows)
+    return _range_stats(candles)[0]
 
 
 def average_range(candles: Sequence[Mapping[str, Number]]) -> float:
     if not candles:
         return 0.0
-    segments = [_to_float(c.get("max", c.get("high", 0.0))) - _to_float(c.get("min", c.get("low", 0.0))) for c in candles]
-    return sum(segments) / len(segments)
+    return _range_stats(candles)[1]
 
 
 def momentum_score(closes: Sequence[float], lookback: int = 5) -> float:
+    if isinstance(closes, np.ndarray):
+        # Columna float64 (p.ej. CandleView.columns.close): reduccion en el kernel
+        if lookback <= 0:
+            return 0.0
+        return float(momentum_kernel(np.ascontiguousarray(closes, dtype=np.float64), int(lookback)))
     if lookback <= 0 or len(closes) < lookback:
         return 0.0
     subset = closes[-lookback:]
@@ -131,8 +423,9 @@ def detect_micro_range(
     if len(candles) < lookback:
         return False
     recent = candles[-lookback:]
-    width = range_width(recent)
-    avg = average_range(recent)
+    if not recent:
+        return True
+    width, avg = _range_stats(recent)
     if avg <= 0:
         return True
     return width <= avg * compression_ratio
@@ -146,10 +439,7 @@ def impulse_direction(
 ) -> Optional[str]:
     """Detect whether the candle qualifies as an impulse."""
 
-    high = _to_float(candle.get("max", candle.get("high", 0.0)))
-    low = _to_float(candle.get("min", candle.get("low", 0.0)))
-    open_ = _to_float(candle.get("open", candle.get("o", 0.0)))
-    close = _to_float(candle.get("close", candle.get("c", 0.0)))
+    open_, high, low, close = candle_ohlc(candle)
     range_ = high - low
     if baseline_range <= 0:
         baseline_range = range_
@@ -190,10 +480,13 @@ def bollinger_extreme(candle: Dict, upper: float, lower: float) -> Tuple[Optiona
     if close is None:
         return None, False
 
-    try:
-        close_value = float(close)
-    except (TypeError, ValueError):
-        return None, False
+    if type(close) is float:
+        close_value = close
+    else:
+        try:
+            close_value = float(close)
+        except (TypeError, ValueError):
+            return None, False
 
     if close_value > upper:
         return "upper", True
@@ -209,6 +502,11 @@ def atr_micro(candles: List[Dict]) -> float:
     if len(candles) < 2:
         return 0.0
 
+    cols = _candle_columns(candles)
+    if cols is not None:
+        # Columnas siempre completas: media de todos los TR de la ventana
+        return float(atr_kernel(cols.high, cols.low, cols.close, len(candles) - 1))
+
     trs: List[float] = []
     for i in range(1, len(candles)):
         high = candles[i].get("max")
@@ -242,18 +540,36 @@ def fibo_zones(candles: List[Dict]) -> Dict[str, float]:
     if not candles:
         return {}
 
-    highs = [c.get("max") for c in candles if c.get("max") is not None]
-    lows = [c.get("min") for c in candles if c.get("min") is not None]
-
-    if not highs or not lows:
-        return {}
+    cols = _candle_columns(candles)
+    if cols is not None:
+        return fibo_levels(float(cols.high.max()), float(cols.low.min()))
 
+    # Una sola pasada: un get y un float por campo, sin listas intermedias
+    high = low = None
     try:
-        high = max(float(h) for h in highs)
-        low = min(float(l) for l in lows)
+        for c in candles:
+            value = c.get("max")
+            if value is not None:
+                value = float(value)
+                if high is None or value > high:
+                    high = value
+            value = c.get("min")
+            if value is not None:
+                value = float(value)
+                if low is None or value < low:
+                    low = value
     except (TypeError, ValueError):
         return {}
 
+    if high is None or low is None:
+        return {}
+
+    return fibo_levels(high, low)
+
+
+def fibo_levels(high: float, low: float) -> Dict[str, float]:
+    """Fibonacci-like zones for an already reduced high/low range."""
+
     rng = high - low
     if rng <= 0:
         level = (high + low) / 2.0
@@ -275,6 +591,15 @@ __all__ = [
     "ema_series",
     "true_ranges",
     "atr",
+    "atr_kernel",
+    "true_ranges_kernel",
+    "ema_last2_kernel",
+    "ema_series_kernel",
+    "momentum_kernel",
+    "range_stats_kernel",
+    "range_bounds_kernel",
+    "warm_up_kernels",
+    "candle_ohlc",
     "body_ratio",
     "wick_ratio",
     "range_width",
@@ -287,4 +612,5 @@ __all__ = [
     "bollinger_extreme",
     "atr_micro",
     "fibo_zones",
+    "fibo_levels",
 ]
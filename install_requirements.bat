@@ -4,5 +4,10 @@ pip install iqoptionapi
 pip install websocket-client
 pip install requests
 pip install python-dotenv
+pip install orjson
+pip install numpy
+pip install numba
+echo Compilando kernels AOT (opcional, requiere compilador C)...
+python build_indicators_aot.py
 echo Dependencias instaladas.
 pause
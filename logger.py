@@ -1,15 +1,29 @@
 ﻿"""Logging utilities for TradingLions_Reforged."""
 from __future__ import annotations
 
+import atexit
 import csv
+import io
 import json
 import os
+import threading
 import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, Mapping, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 
 from config import BotConfig
 
+# orjson si esta instalado (mas rapido y emite bytes UTF-8); json estandar si no
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+_ORJSON_OPTIONS = (
+    orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+)
+
 CSV_HEADER = [
     "timestamp",
     "trade_id",
@@ -69,33 +83,39 @@ def ensure_csv_header(csv_path: str) -> None:
             csv.writer(handle).writerow(CSV_HEADER)
         return
 
+    # Caso normal: basta con la primera linea, sin leer el historico completo
     try:
         with path.open("r", newline="", encoding="utf-8") as handle:
-            reader = csv.reader(handle)
-            rows = list(reader)
+            first_line = handle.readline()
     except Exception:
         return
-    if not rows:
+    if not first_line:
         with path.open("w", newline="", encoding="utf-8") as handle:
             csv.writer(handle).writerow(CSV_HEADER)
         return
-
-    header = rows[0]
-    if header == CSV_HEADER:
+    if next(csv.reader([first_line]), []) == CSV_HEADER:
         return
 
-    data_rows: Iterable[Iterable[str]] = rows[1:]
-    dict_rows = []
-    for raw in data_rows:
-        entry = dict(zip(header, raw))
-        if header == LEGACY_HEADER_V1:
-            entry = _upgrade_legacy_v1(entry)
-        dict_rows.append(entry)
-    with path.open("w", newline="", encoding="utf-8") as handle:
-        writer = csv.writer(handle)
-        writer.writerow(CSV_HEADER)
-        for row in dict_rows:
-            writer.writerow([row.get(key, "") for key in CSV_HEADER])
+    # Encabezado viejo: se migra fila a fila a un temporal y se reemplaza al final
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        with path.open("r", newline="", encoding="utf-8") as src, tmp_path.open(
+            "w", newline="", encoding="utf-8"
+        ) as dst:
+            reader = csv.reader(src)
+            header = next(reader, [])
+            legacy_v1 = header == LEGACY_HEADER_V1
+            writer = csv.writer(dst)
+            writer.writerow(CSV_HEADER)
+            for raw in reader:
+                entry = dict(zip(header, raw))
+                if legacy_v1:
+                    entry = _upgrade_legacy_v1(entry)
+                writer.writerow([entry.get(key, "") for key in CSV_HEADER])
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        tmp_path.unlink(missing_ok=True)
+        print(f"[LOGGER ERROR] No se pudo migrar el encabezado de {path}: {exc}")
 
 
 def _upgrade_legacy_v1(entry: Dict[str, Any]) -> Dict[str, Any]:
@@ -121,19 +141,222 @@ def _upgrade_legacy_v1(entry: Dict[str, Any]) -> Dict[str, Any]:
     return upgraded
 
 
-class TradeLogger:
+# Columnas del CSV que llevan JSON embebido; encoder compacto creado una vez
+_JSON_COLUMNS = frozenset(("context", "decision_context", "logic", "metadata"))
+_json_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def _encode_json(value: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=_ORJSON_OPTIONS).decode("utf-8")
+        except TypeError:
+            pass  # tipo que orjson no serializa: se intenta con json
+    return _json_encoder.encode(value)
+
+
+def _jsonl_line(record: Mapping[str, Any]) -> bytes:
+    """Una linea JSONL en bytes UTF-8 (se escribe en modo binario)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, option=_ORJSON_OPTIONS | orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+# Un solo buffer + csv.writer reutilizado (bot y watcher escriben desde hilos distintos)
+_csv_buffer = io.StringIO()
+_csv_writer = csv.writer(_csv_buffer)
+_csv_lock = threading.Lock()
+
+
+def _csv_line(row: Iterable[Any]) -> str:
+    with _csv_lock:
+        _csv_buffer.seek(0)
+        _csv_buffer.truncate()
+        _csv_writer.writerow(row)
+        return _csv_buffer.getvalue()
+
+
+class _BatchWriter:
+    """
+    Acumula lineas por archivo y las escribe en bloque desde un hilo daemon.
+    Se vacia cada *interval_ms* o al llegar a *batch_size* lineas (y al salir).
+    Las lineas de un mismo archivo son todas str (modo texto) o todas bytes
+    (modo binario).
+    """
+
+    def __init__(self, batch_size: int = 16, interval_ms: float = 50.0) -> None:
+        self.batch_size = max(1, int(batch_size))
+        self.interval = max(1.0, float(interval_ms)) / 1000.0
+        self._pending: Dict[Tuple[str, Optional[str]], List[Any]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def write(self, path: str, text: str | bytes, newline: Optional[str] = None) -> None:
+        with self._lock:
+            self._pending.setdefault((path, newline), []).append(text)
+            self._count += 1
+            full = self._count >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def flush(self) -> None:
+        # _io_lock mantiene el orden entre lotes si flush llega desde dos hilos
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._count = 0
+            for (path, newline), chunks in pending.items():
+                if isinstance(chunks[0], bytes):
+                    with open(path, "ab") as handle:
+                        handle.write(b"".join(chunks))
+                    continue
+                with open(path, "a", newline=newline, encoding="utf-8") as handle:
+                    handle.write("".join(chunks))
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"[LOGGER ERROR] No se pudo vaciar el lote: {exc}")
+
+
+_shared_writer: Optional[_BatchWriter] = None
+_shared_writer_lock = threading.Lock()
+
+
+def _shared_batch_writer() -> _BatchWriter:
+    """Writer comun a todos los loggers: un solo hilo y el orden de los eventos
+    se conserva aunque TradeLogger y StandaloneResultLogger escriban el mismo archivo."""
+    global _shared_writer
+    with _shared_writer_lock:
+        if _shared_writer is None:
+            _shared_writer = _BatchWriter(
+                batch_size=int(os.environ.get("BOT_LOG_BATCH_SIZE", "16")),
+                interval_ms=float(os.environ.get("BOT_LOG_BATCH_MS", "50")),
+            )
+        return _shared_writer
+
+
+@lru_cache(maxsize=8)
+def _daily_log_paths(log_dir: str, date: str) -> Tuple[str, str]:
+    """Rutas CSV/JSONL del dia, comunes a TradeLogger y StandaloneResultLogger.
+    makedirs y la revision del encabezado se hacen una vez por (carpeta, fecha)
+    en todo el proceso."""
+    os.makedirs(log_dir, exist_ok=True)
+    csv_path = os.path.join(log_dir, f"trades_{date}.csv")
+    jsonl_path = os.path.join(log_dir, f"trades_{date}.jsonl")
+    ensure_csv_header(csv_path)
+    return csv_path, jsonl_path
+
+
+class _DailyLogFiles:
+    """
+    Rutas trades_<fecha>.csv/.jsonl del dia en curso. El cambio de dia se
+    detecta de forma perezosa: en regimen cada escritura solo compara
+    time.time() con la proxima medianoche local.
+    """
+
+    log_dir: str
+    csv_path: str
+    jsonl_path: str
+
+    def _open_day(self) -> Tuple[str, str]:
+        now = time.localtime()
+        self.csv_path, self.jsonl_path = paths = _daily_log_paths(
+            self.log_dir, time.strftime("%Y-%m-%d", now)
+        )
+        # mktime normaliza tm_mday + 1 (fin de mes/anio)
+        self._day_end = time.mktime(
+            (now.tm_year, now.tm_mon, now.tm_mday + 1, 0, 0, 0, 0, 0, -1)
+        )
+        self._paths = paths
+        return paths
+
+    def _day_paths(self) -> Tuple[str, str]:
+        """(csv_path, jsonl_path) del dia actual; el par se lee de una vez para
+        que CSV y JSONL de un mismo evento caigan en el mismo dia."""
+        if time.time() >= self._day_end:
+            return self._open_day()
+        return self._paths
+
+
+class TradeLogger(_DailyLogFiles):
     """Handles CSV/JSON logging for trade lifecycle events."""
 
     def __init__(self, config: BotConfig) -> None:
         self.config = config
         self.log_dir = self.config.log_directory
-        os.makedirs(self.log_dir, exist_ok=True)
-
-        date = time.strftime("%Y-%m-%d")
-        self.csv_path = os.path.join(self.log_dir, f"trades_{date}.csv")
-        self.jsonl_path = os.path.join(self.log_dir, f"trades_{date}.jsonl")
+        self._open_day()
+        # Todas las escrituras (OPEN y CLOSE) van en lote fuera del hilo de trading
+        self._writer = _shared_batch_writer()
+
+    def log(
+        self,
+        asset: str,
+        direction: str,
+        stake: float,
+        level: int = 0,
+        outcome: str = "",
+        profit: float = 0.0,
+        cumulative: float = 0.0,
+        reference_price: Optional[float] = None,
+        execution_price: Optional[float] = None,
+        mode: str = "",
+        extra: Optional[Mapping[str, Any]] = None,
+        trade_id: Optional[str] = None,
+    ) -> None:
+        """Registra un CLOSE recibido por WebSocket; la escritura va en lote."""
+        ts = time.time()
+        details = dict(extra or {})
+        metadata: Dict[str, Any] = {
+            "level": level,
+            "cumulative": cumulative,
+            "execution_price": execution_price,
+        }
+        pattern = details.pop("pattern", "")
+        score = details.pop("score", "")
+        metadata.update(details)
+        record: Dict[str, Any] = {
+            "timestamp": ts,
+            "trade_id": trade_id,
+            "status": "CLOSE",
+            "asset": asset,
+            "direction": direction,
+            "regime": mode,
+            "reason": "",
+            "pattern": pattern,
+            "score": score,
+            "stake": stake,
+            "payout": "",
+            "entry_price": reference_price,
+            "context": None,
+            "decision_context": None,
+            "logic": None,
+            "logic_flat": "",
+            "metadata": metadata,
+            "outcome_real": outcome,
+            "profit_real": profit,
+            "close_price": "",
+            "open_time": "",
+            "close_time": ts,
+            "duration_sec": "",
+        }
+        csv_path, jsonl_path = self._day_paths()
+        self._writer.write(jsonl_path, _jsonl_line(record))
+        self._writer.write(csv_path, _csv_line(self._csv_row(record)), newline="")
 
-        ensure_csv_header(self.csv_path)
+    def flush(self) -> None:
+        self._writer.flush()
 
     def log_trade_open(self, order: Dict[str, Any]) -> None:
         try:
@@ -163,10 +386,9 @@ class TradeLogger:
                 "duration_sec": "",
             }
 
-            with open(self.jsonl_path, "a", encoding="utf-8") as handle:
-                handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
-
-            self._write_csv_row(payload)
+            csv_path, jsonl_path = self._day_paths()
+            self._writer.write(jsonl_path, _jsonl_line(payload))
+            self._writer.write(csv_path, _csv_line(self._csv_row(payload)), newline="")
         except Exception as exc:
             print(f"[LOGGER ERROR] No se pudo registrar OPEN: {exc}")
 
@@ -202,23 +424,19 @@ class TradeLogger:
             "duration_sec": payload.get("duration_sec"),
         }
 
-        with open(self.jsonl_path, "a", encoding="utf-8") as handle:
-            handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        csv_path, jsonl_path = self._day_paths()
+        self._writer.write(jsonl_path, _jsonl_line(record))
+        self._writer.write(csv_path, _csv_line(self._csv_row(record)), newline="")
 
-        self._write_csv_row(record)
-
-    def _write_csv_row(self, payload: Mapping[str, Any]) -> None:
+    @staticmethod
+    def _csv_row(payload: Mapping[str, Any]) -> List[Any]:
         row = []
         for key in CSV_HEADER:
             value = payload.get(key, "")
-            if key in {"context", "decision_context", "logic", "metadata"}:
-                if value not in (None, ""):
-                    value = json.dumps(value, ensure_ascii=False)
-                else:
-                    value = ""
+            if key in _JSON_COLUMNS:
+                value = _encode_json(value) if value not in (None, "") else ""
             row.append(value)
-        with open(self.csv_path, "a", newline="", encoding="utf-8") as handle:
-            csv.writer(handle).writerow(row)
+        return row
 
 
 class DecisionLogger:
@@ -228,11 +446,11 @@ class DecisionLogger:
         self.log_path = log_path
 
     def log_decision(self, decision: Dict[str, Any]) -> None:
-        with open(self.log_path, "a", encoding="utf-8") as handle:
-            handle.write(json.dumps(decision, ensure_ascii=False) + "\n")
+        with open(self.log_path, "ab") as handle:
+            handle.write(_jsonl_line(decision))
 
 
-class StandaloneResultLogger:
+class StandaloneResultLogger(_DailyLogFiles):
     """
     Logger para el watcher de resultados.
     Escribe SOLO eventos CLOSE en el mismo CSV/JSONL que TradeLogger,
@@ -241,13 +459,11 @@ class StandaloneResultLogger:
 
     def __init__(self, log_dir: str = "logs") -> None:
         self.log_dir = log_dir
-        os.makedirs(self.log_dir, exist_ok=True)
-
-        date = time.strftime("%Y-%m-%d")
-        self.csv_path = os.path.join(self.log_dir, f"trades_{date}.csv")
-        self.jsonl_path = os.path.join(self.log_dir, f"trades_{date}.jsonl")
+        self._open_day()
+        self._writer = _shared_batch_writer()
 
-        ensure_csv_header(self.csv_path)
+    def flush(self) -> None:
+        self._writer.flush()
 
     def log_close(self, payload: Mapping[str, Any]) -> None:
         """
@@ -286,21 +502,11 @@ class StandaloneResultLogger:
                 "duration_sec": payload.get("duration_sec"),
             }
 
-            with open(self.jsonl_path, "a", encoding="utf-8") as handle:
-                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
-
-            row = []
-            for key in CSV_HEADER:
-                value = record.get(key, "")
-                if key in {"context", "decision_context", "logic", "metadata"}:
-                    if value not in (None, ""):
-                        value = json.dumps(value, ensure_ascii=False)
-                    else:
-                        value = ""
-                row.append(value)
-
-            with open(self.csv_path, "a", newline="", encoding="utf-8") as handle:
-                csv.writer(handle).writerow(row)
+            csv_path, jsonl_path = self._day_paths()
+            self._writer.write(jsonl_path, _jsonl_line(record))
+            self._writer.write(
+                csv_path, _csv_line(TradeLogger._csv_row(record)), newline=""
+            )
 
         except Exception as exc:
             print(f"[RESULT LOGGER ERROR] No se pudo registrar CLOSE: {exc}")
@@ -1,10 +1,19 @@
 ﻿import importlib.util
 import inspect
+import os
 import sys
-spec = importlib.util.spec_from_file_location('bot_rec', '__pycache__/bot.cpython-310.pyc')
+
+# Cargar desde el fuente si existe; si no, el .pyc del interprete actual
+# (no el de 3.10 a fuego). LazyLoader difiere la ejecucion del modulo hasta
+# el primer acceso a un atributo.
+path = 'bot.py'
+if not os.path.exists(path):
+    path = importlib.util.cache_from_source(path)
+spec = importlib.util.spec_from_file_location('bot_rec', path)
+spec.loader = importlib.util.LazyLoader(spec.loader)
 module = importlib.util.module_from_spec(spec)
 sys.modules['bot_rec'] = module
 spec.loader.exec_module(module)
-print('module loaded:', module)
+print('module loaded:', path)
 print('has TradingLionsBot?', hasattr(module, 'TradingLionsBot'))
-print(inspect.getsource(module.TradingLionsBot))
+print(inspect.getsource(module.TradingLionsBot))
@@ -2,24 +2,115 @@
 
 from __future__ import annotations
 
+import itertools
 import threading
 import time
-from typing import Any, Dict, Optional, Sequence, Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
 
 from logger import StandaloneResultLogger
 
+# Etiquetas de resultado del broker / wrappers (ya en minusculas)
+_WIN_LABELS = frozenset({"win", "won", "success", "victory", "gana"})
+_LOSS_LABELS = frozenset(
+    {"loss", "loose", "lost", "fail", "failed", "defeat", "losses", "perdida"}
+)
+_DRAW_LABELS = frozenset({"draw", "tie", "equal", "refund", "refunded", "igual"})
+# Resultado crudo -> outcome_real del CLOSE (cualquier otro valor es DRAW)
+_OUTCOME_REAL = {**dict.fromkeys(_WIN_LABELS, "WIN"), **dict.fromkeys(_LOSS_LABELS, "LOSS")}
+# Campos del OPEN que pasan tal cual al CLOSE (en el orden del registro)
+_PASSTHROUGH_KEYS = (
+    "trade_id",
+    "asset",
+    "direction",
+    "regime",
+    "reason",
+    "pattern",
+    "score",
+    "stake",
+    "payout",
+    "entry_price",
+)
+
+
+@lru_cache(maxsize=64)
+def _outcome_label(label: str) -> Optional[str]:
+    # El broker repite un punado de etiquetas: strip/lower una vez por etiqueta
+    normalized = label.strip().lower()
+    if normalized in _WIN_LABELS:
+        return 'win'
+    if normalized in _LOSS_LABELS:
+        return 'loss'
+    if normalized in _DRAW_LABELS:
+        return 'draw'
+    return None
+
+
+@dataclass(slots=True)
+class PendingTrade:
+    """Trade abierto a la espera de su CLOSE (entrada de ResultWatcher.pending)."""
+
+    open: Mapping[str, Any]
+    open_ts: int
+    # expire_ts (reloj de pared) va al log; expire_mono planifica el fallback
+    expire_ts: float
+    expire_mono: float
+    # (stake, payout, open_time) ya convertidos, ver ResultWatcher._open_numbers
+    numbers: Tuple[float, float, Optional[float]]
+    option_id: Optional[int] = None
+    order_ref: Any = None
+    resolved: bool = False
+    # Orden de registro (prioridad en el match por open_ts)
+    seq: int = 0
+    # Instante monotono del proximo reintento de optioninfo
+    retry_at: float = 0.0
+
 
 class ResultWatcher:
     """Tracks open trades and enforces CLOSE events via polling fallback."""
 
+    __slots__ = (
+        "api",
+        "logger",
+        "pending",
+        "_by_option_id",
+        "_by_open_ts",
+        "_seq",
+        "_closed_cache",
+        "lock",
+        "running",
+        "verbose",
+        "_wakeup",
+        "_stopped",
+        "_fallback_thread",
+    )
+
+    # Segundos antes de expire_ts en que se consulta optioninfo por primera vez
+    EXPIRY_LEAD = 0.5
+    # Reintento mientras un trade vencido no aparece en closed_options
+    RETRY_INTERVAL = 1.0
+    # Vida de la ultima respuesta de optioninfo_v2: agrupa las pasadas de una
+    # rafaga de vencimientos; menor que RETRY_INTERVAL para que un reintento
+    # siempre consulte de nuevo
+    CLOSED_CACHE_TTL = 0.5
+
     def __init__(self, api, logger: StandaloneResultLogger):
         self.api = api
         self.logger = logger
-        self.pending: Dict[Any, Dict[str, Any]] = {}
+        self.pending: Dict[Any, PendingTrade] = {}
+        # Indices secundarios de pending (se mantienen con self.lock tomado)
+        self._by_option_id: Dict[int, Any] = {}
+        self._by_open_ts: Dict[int, List[Any]] = {}
+        self._seq = itertools.count()
+        self._closed_cache: Tuple[float, Optional[Sequence[Dict[str, Any]]]] = (0.0, None)
         self.lock = threading.Lock()
         self.running = True
         self.verbose = True
-        self._fallback_event = threading.Event()
+        # Comparte el lock de pending: el hilo fallback duerme hasta el proximo
+        # vencimiento y se le avisa cuando pending cambia
+        self._wakeup = threading.Condition(self.lock)
+        self._stopped = threading.Event()
         self._fallback_thread = threading.Thread(
             target=self._fallback_loop, daemon=True
         )
@@ -30,12 +121,12 @@ class ResultWatcher:
         return
 
     def watcher_loop(self) -> None:
-        """Legacy compatibility loop (kept for start.py threads)."""
-        while self.running:
-            time.sleep(1)
+        """Legacy compatibility loop: blocks until :meth:`stop` (no periodic wakeups)."""
+        self._stopped.wait()
 
-    def register_open_trade(self, open_payload: Dict[str, Any]) -> None:
-        if not isinstance(open_payload, dict):
+    def register_open_trade(self, open_payload: Mapping[str, Any]) -> None:
+        # Solo lectura: acepta la vista de solo lectura de la orden (sin copiarla)
+        if not isinstance(open_payload, Mapping):
             return
         tid = open_payload.get("trade_id")
         if not tid:
@@ -43,35 +134,52 @@ class ResultWatcher:
         open_time_exact = self._safe_float(open_payload.get("open_time"), time.time())
         open_ts = round(open_time_exact)
         expire_ts = self._compute_expire_ts(open_payload, open_time_exact)
+        # expire_ts (reloj de pared) va al log; la planificacion usa el reloj
+        # monotono, inmune a los saltos de NTP
+        expire_mono = time.monotonic() + (expire_ts - time.time())
         option_id = self._normalize_option_id(
             open_payload.get("broker_event", {}).get("option_id")
             or open_payload.get("option_id")
             or open_payload.get("order_id")
         )
 
-        # NO sobrescribir si ya existe un option_id válido y el nuevo viene vacío
-        if tid in self.pending:
-            existing = self.pending[tid]
-            if existing.get("option_id") and not option_id:
-                self._log(f"[skip overwrite vacío] {tid}")
-                return
-
-        bucket = {
-            "open": open_payload,
-            "open_ts": open_ts,
-            "expire_ts": expire_ts,
-            "resolved": False,
-            "option_id": option_id,
-            "order_ref": open_payload.get("order_id_raw")
+        bucket = PendingTrade(
+            open=open_payload,
+            open_ts=open_ts,
+            expire_ts=expire_ts,
+            expire_mono=expire_mono,
+            numbers=self._open_numbers(open_payload),
+            option_id=option_id,
+            order_ref=open_payload.get("order_id_raw")
             or open_payload.get("order_id"),
-        }
-        with self.lock:
-            self.pending[tid] = bucket
-        self._fallback_event.set()
+        )
+        # Todo el trabajo (conversiones, bucket) va antes del lock; dentro solo
+        # la comprobacion y la insercion, para no frenar al hilo fallback
+        with self._wakeup:
+            existing = self.pending.get(tid)
+            # NO sobrescribir si ya existe un option_id válido y el nuevo viene vacío
+            skip = existing is not None and bool(existing.option_id) and not option_id
+            if not skip:
+                self._insert_pending(tid, bucket)
+        if skip:
+            self._log(f"[skip overwrite vacío] {tid}")
+            return
         self._log(
             f"registrado {tid} option_id={option_id} open={open_time_exact:.2f} expire={expire_ts:.2f}"
         )
 
+    def _insert_pending(self, tid: Any, bucket: PendingTrade) -> None:
+        """Alta (o reemplazo) de *tid* en pending y sus indices (con self.lock tomado)."""
+        previous = self._drop_pending(tid)
+        # Re-registrar conserva el orden original (prioridad en el match por open_ts)
+        bucket.seq = previous.seq if previous else next(self._seq)
+        self.pending[tid] = bucket
+        self._by_open_ts.setdefault(bucket.open_ts, []).append(tid)
+        option_id = bucket.option_id
+        if option_id is not None:
+            self._by_option_id[option_id] = tid
+        self._wakeup.notify()
+
     def handle_websocket_close(self, close_event: Dict[str, Any]) -> None:
         close_ts = close_event.get("close_time") or close_event.get("actual_expire")
         if not close_ts:
@@ -80,19 +188,72 @@ class ResultWatcher:
             close_ts = round(float(close_ts))
         except (TypeError, ValueError):
             return
+        # Hubo un cierre: la respuesta cacheada de optioninfo ya no vale
+        self._closed_cache = (0.0, None)
 
+        option_id = self._normalize_option_id(
+            close_event.get("option_id") or close_event.get("id")
+        )
         with self.lock:
-            for tid, bucket in list(self.pending.items()):
-                if abs(bucket["open_ts"] - close_ts) <= 2:
-                    self._resolve_and_log(bucket["open"], close_event)
-                    bucket["resolved"] = True
-                    del self.pending[tid]
-                    break
+            tid = self._by_option_id.get(option_id) if option_id is not None else None
+            if tid is None:
+                # open_ts a +-2 s; entre varios, el registrado primero
+                candidates = [
+                    cand
+                    for offset in range(-2, 3)
+                    for cand in self._by_open_ts.get(close_ts + offset, ())
+                ]
+                if not candidates:
+                    return
+                tid = min(candidates, key=lambda cand: self.pending[cand].seq)
+            bucket = self._drop_pending(tid)
+            bucket.resolved = True
+            self._wakeup.notify()
+        # Serializar y encolar el CLOSE fuera del lock (no frena al hilo fallback)
+        self._resolve_and_log(bucket.open, close_event, bucket.numbers)
+
+    def _drop_pending(self, tid: Any) -> Optional[PendingTrade]:
+        """Quita *tid* de pending y de sus indices (con self.lock tomado)."""
+        bucket = self.pending.pop(tid, None)
+        if bucket is None:
+            return None
+        same_ts = self._by_open_ts.get(bucket.open_ts)
+        if same_ts is not None:
+            same_ts.remove(tid)
+            if not same_ts:
+                del self._by_open_ts[bucket.open_ts]
+        option_id = bucket.option_id
+        if option_id is not None and self._by_option_id.get(option_id) == tid:
+            del self._by_option_id[option_id]
+        return bucket
+
+    def _next_fallback_deadline(self) -> Optional[float]:
+        """Instante monotono de la proxima pasada util (con self.lock tomado); None si no hay nada que vigilar."""
+        if not self.api:
+            return None
+        deadline: Optional[float] = None
+        for bucket in self.pending.values():
+            if bucket.resolved:
+                continue
+            due = max(bucket.expire_mono - self.EXPIRY_LEAD, bucket.retry_at)
+            if deadline is None or due < deadline:
+                deadline = due
+        return deadline
 
     def _fallback_loop(self) -> None:
         while self.running:
-            self._fallback_event.wait(timeout=3)
-            self._fallback_event.clear()
+            with self._wakeup:
+                while self.running:
+                    deadline = self._next_fallback_deadline()
+                    if deadline is None:
+                        self._wakeup.wait()
+                        continue
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._wakeup.wait(timeout)
+            if not self.running:
+                break
             try:
                 self._execute_fallback_pass()
             except Exception as exc:  # pragma: no cover - defensive logging
@@ -102,51 +263,62 @@ class ResultWatcher:
         if blocking:
             self._execute_fallback_pass()
         else:
-            self._fallback_event.set()
+            # Solo reevalua los vencimientos; la pasada corre cuando alguno llega
+            with self._wakeup:
+                self._wakeup.notify()
 
     def _execute_fallback_pass(self) -> None:
         if not self.api:
             return
+        now = time.monotonic()
         with self.lock:
-            snapshot = {
-                tid: dict(bucket)
-                for tid, bucket in self.pending.items()
-                if not bucket.get("resolved")
-            }
+            # Solo los trades ya vencidos, como tuplas (tid, open, numbers,
+            # option_id, order_ref): sin copiar buckets ni recorrerlos otra vez
+            snapshot = []
+            for tid, bucket in self.pending.items():
+                if bucket.resolved:
+                    continue
+                if now < bucket.expire_mono - self.EXPIRY_LEAD:
+                    continue
+                snapshot.append(
+                    (
+                        tid,
+                        bucket.open,
+                        bucket.numbers,
+                        bucket.option_id,
+                        bucket.order_ref,
+                    )
+                )
+                # Marcar el reintento antes de consultar: una salida temprana
+                # (API caida, sin option_id) no debe despertar al hilo en bucle
+                bucket.retry_at = now + self.RETRY_INTERVAL
         if not snapshot:
             return
-        now = time.time()
-        closed_cache: Optional[Sequence[Dict[str, Any]]] = None
-        for tid, bucket in snapshot.items():
-            open_payload = bucket["open"]
-            expire_ts = float(bucket.get("expire_ts") or 0.0)
-            if expire_ts and now < expire_ts - 0.5:
-                self._log(
-                    f"skip {tid} antes de expirar (now={now:.2f} < {expire_ts:.2f})"
-                )
-                continue
-            option_id = bucket.get("option_id")
+        closed_index: Optional[Dict[str, Dict[str, Any]]] = None
+        for tid, open_payload, numbers, option_id, order_ref in snapshot:
             if option_id is None:
                 option_id = self._normalize_option_id(
                     open_payload.get("broker_event", {}).get("option_id")
                     or open_payload.get("option_id")
                     or open_payload.get("order_id")
-                    or bucket.get("order_ref")
+                    or order_ref
                 )
                 if option_id is not None:
                     with self.lock:
                         live = self.pending.get(tid)
                         if live:
-                            live["option_id"] = option_id
+                            live.option_id = option_id
+                            self._by_option_id[option_id] = tid
             if option_id is None:
                 self._log(f"[skip] {tid} sin option_id")
                 continue
-            if closed_cache is None:
-                closed_cache = self._fetch_closed_options()
-                if closed_cache is None:
+            if closed_index is None:
+                closed = self._fetch_closed_options()
+                if closed is None:
                     return
+                closed_index = self._index_closed_options(closed)
             outcome, profit_amt, entry = self._extract_result_from_closed(
-                closed_cache, option_id
+                closed_index, option_id
             )
             if outcome is None:
                 self._log(f"[wait] {tid} sin resultado en optioninfo")
@@ -171,14 +343,16 @@ class ResultWatcher:
                 "option_id": entry.get("option_id") or option_id,
                 "raw_event": entry,
             }
-            self._resolve_and_log(open_payload, close_event)
+            self._resolve_and_log(open_payload, close_event, numbers)
             with self.lock:
-                bucket_live = self.pending.get(tid)
+                bucket_live = self._drop_pending(tid)
                 if bucket_live:
-                    bucket_live["resolved"] = True
-                    self.pending.pop(tid, None)
+                    bucket_live.resolved = True
 
     def _fetch_closed_options(self) -> Optional[Sequence[Dict[str, Any]]]:
+        fetched_at, cached = self._closed_cache
+        if cached is not None and time.monotonic() - fetched_at < self.CLOSED_CACHE_TTL:
+            return cached
         try:
             payload = self.api.get_optioninfo_v2(50)
         except Exception as exc:
@@ -189,13 +363,16 @@ class ResultWatcher:
         msg = payload.get("msg") or payload
         closed = msg.get("closed_options") or msg.get("closed")
         if isinstance(closed, list):
+            self._closed_cache = (time.monotonic(), closed)
             return closed
         return None
 
-    def _extract_result_from_closed(
-        self, entries: Sequence[Dict[str, Any]], option_id: Any
-    ) -> Tuple[Optional[str], float, Optional[Dict[str, Any]]]:
-        target = str(option_id)
+    @staticmethod
+    def _index_closed_options(
+        entries: Sequence[Dict[str, Any]]
+    ) -> Dict[str, Dict[str, Any]]:
+        """{str(option_id): entry} de una respuesta de optioninfo (gana la primera aparicion)."""
+        index: Dict[str, Dict[str, Any]] = {}
         for entry in entries:
             candidate = entry.get("option_id")
             if candidate is None:
@@ -204,20 +381,26 @@ class ResultWatcher:
                     candidate = raw_id[0]
             if candidate is None:
                 continue
-            if str(candidate) != target:
-                continue
-            raw_outcome = entry.get("result") or entry.get("win")
-            outcome = self._normalize_outcome_label(raw_outcome) or raw_outcome
-            profit_amt = self._coerce_profit_amount(entry.get("profit_amount"))
-            if profit_amt == 0.0:
-                try:
-                    win_amount = float(entry.get("win_amount", 0) or 0.0)
-                    amount = float(entry.get("amount", 0) or 0.0)
-                    profit_amt = abs(win_amount - amount)
-                except (TypeError, ValueError):
-                    profit_amt = 0.0
-            return outcome, profit_amt, entry
-        return None, 0.0, None
+            index.setdefault(str(candidate), entry)
+        return index
+
+    def _extract_result_from_closed(
+        self, closed_index: Mapping[str, Dict[str, Any]], option_id: Any
+    ) -> Tuple[Optional[str], float, Optional[Dict[str, Any]]]:
+        entry = closed_index.get(str(option_id))
+        if entry is None:
+            return None, 0.0, None
+        raw_outcome = entry.get("result") or entry.get("win")
+        outcome = self._normalize_outcome_label(raw_outcome) or raw_outcome
+        profit_amt = self._coerce_profit_amount(entry.get("profit_amount"))
+        if profit_amt == 0.0:
+            try:
+                win_amount = float(entry.get("win_amount", 0) or 0.0)
+                amount = float(entry.get("amount", 0) or 0.0)
+                profit_amt = abs(win_amount - amount)
+            except (TypeError, ValueError):
+                profit_amt = 0.0
+        return outcome, profit_amt, entry
 
     def _interpret_check_win_result(self, result: Any) -> tuple[Optional[str], float]:
         if result is None:
@@ -316,16 +499,7 @@ class ResultWatcher:
     def _normalize_outcome_label(label: Any) -> Optional[str]:
         if not isinstance(label, str):
             return None
-        normalized = label.strip().lower()
-        if not normalized:
-            return None
-        if normalized in {'win', 'won', 'success', 'victory', 'gana'}:
-            return 'win'
-        if normalized in {'loss', 'loose', 'lost', 'fail', 'failed', 'defeat', 'losses', 'perdida'}:
-            return 'loss'
-        if normalized in {'draw', 'tie', 'equal', 'refund', 'refunded', 'igual'}:
-            return 'draw'
-        return None
+        return _outcome_label(label)
 
     @staticmethod
     def _coerce_profit_amount(value: Any) -> float:
@@ -334,26 +508,45 @@ class ResultWatcher:
         except (TypeError, ValueError):
             return 0.0
 
-    def _resolve_and_log(self, open_payload: Dict[str, Any], close_event: Dict[str, Any]) -> None:
+    @classmethod
+    def _open_numbers(
+        cls, open_payload: Mapping[str, Any]
+    ) -> Tuple[float, float, Optional[float]]:
+        """(stake, payout, open_time) del OPEN, convertidos una vez al registrar.
+        open_time es None si falta: el CLOSE usa entonces su close_time."""
+        try:
+            open_time: Optional[float] = float(open_payload["open_time"])
+        except (KeyError, TypeError, ValueError):
+            open_time = None
+        return (
+            cls._safe_float(open_payload.get("stake") or 0.0),
+            cls._safe_float(open_payload.get("payout") or 0.0),
+            open_time,
+        )
+
+    def _resolve_and_log(
+        self,
+        open_payload: Mapping[str, Any],
+        close_event: Dict[str, Any],
+        numbers: Optional[Tuple[float, float, Optional[float]]] = None,
+    ) -> None:
         raw_result = str(close_event.get("result", "")).strip().lower()
         profit_amt = float(close_event.get("profit_amount", 0) or 0.0)
-        stake = float(open_payload.get("stake", 0) or 0.0)
-        payout = float(open_payload.get("payout", 0) or 0.0)
-        if raw_result in {"win", "won", "success", "victory"}:
-            outcome = "WIN"
+        stake, payout, open_time = numbers or self._open_numbers(open_payload)
+        outcome = _OUTCOME_REAL.get(raw_result, "DRAW")
+        if outcome == "WIN":
             profit_real = round(abs(profit_amt), 2)
             if profit_real == 0.0 and stake > 0:
                 profit_real = round(stake * payout, 2)
-        elif raw_result in {"loss", "loose", "lost", "fail", "failed", "defeat"}:
-            outcome = "LOSS"
+        elif outcome == "LOSS":
             profit_real = round(-abs(profit_amt), 2)
             if profit_real == 0.0 and stake > 0:
                 profit_real = round(-stake, 2)
         else:
-            outcome = "DRAW"
             profit_real = 0.0
         close_time = float(close_event.get("close_time", time.time()))
-        open_time = float(open_payload.get("open_time", close_time))
+        if open_time is None:
+            open_time = close_time
         duration = close_time - open_time
         context = open_payload.get("context")
         decision_payload = open_payload.get("decision")
@@ -362,24 +555,16 @@ class ResultWatcher:
         autolearn_payload = open_payload.get("autolearn")
         if not autolearn_payload and isinstance(context, dict):
             autolearn_payload = context.get("autolearn")
+        get = open_payload.get
         final = {
             "timestamp": close_time,
             "status": "CLOSE",
-            "trade_id": open_payload.get("trade_id"),
-            "asset": open_payload.get("asset"),
-            "direction": open_payload.get("direction"),
-            "regime": open_payload.get("regime"),
-            "reason": open_payload.get("reason"),
-            "pattern": open_payload.get("pattern"),
-            "score": open_payload.get("score"),
-            "stake": open_payload.get("stake"),
-            "payout": open_payload.get("payout"),
-            "entry_price": open_payload.get("entry_price"),
+            **{key: get(key) for key in _PASSTHROUGH_KEYS},
             "context": context,
-            "decision_context": open_payload.get("decision_context", context),
-            "logic": open_payload.get("logic"),
-            "logic_flat": open_payload.get("logic_flat", ""),
-            "metadata": open_payload.get("metadata", {}),
+            "decision_context": get("decision_context", context),
+            "logic": get("logic"),
+            "logic_flat": get("logic_flat", ""),
+            "metadata": get("metadata", {}),
             "outcome_real": outcome,
             "profit_real": profit_real,
             "close_price": close_event.get("value"),
@@ -405,18 +590,33 @@ class ResultWatcher:
 
     @staticmethod
     def _normalize_option_id(raw: Any) -> Optional[int]:
-        if raw is None:
+        # Caso comun: el broker ya manda un int (bool es int pero no es un id)
+        kind = type(raw)
+        if kind is int:
+            return raw
+        if raw is None or kind is bool:
             return None
         if isinstance(raw, (list, tuple)) and raw:
             raw = raw[0]
+            if type(raw) is int:
+                return raw
         try:
             return int(str(raw).strip())
         except (TypeError, ValueError, AttributeError):
             return None
 
     def stop(self) -> None:
-        self.running = False
-        self._fallback_event.set()
+        with self._wakeup:
+            self.running = False
+            self._wakeup.notify_all()
+        self._stopped.set()
+        # Los CLOSE van en lote desde el hilo del writer: dejarlos en disco al parar
+        flush = getattr(self.logger, "flush", None)
+        if flush is not None:
+            try:
+                flush()
+            except Exception as exc:
+                self._log(f"[error] flush: {exc}")
 
     @staticmethod
     def _safe_float(value: Any, default: float = 0.0) -> float:
@@ -425,7 +625,7 @@ class ResultWatcher:
         except (TypeError, ValueError):
             return default
 
-    def _compute_expire_ts(self, open_payload: Dict[str, Any], open_time: float) -> float:
+    def _compute_expire_ts(self, open_payload: Mapping[str, Any], open_time: float) -> float:
         base_time = open_time if open_time > 0 else time.time()
         duration_min = self._safe_float(open_payload.get("duration"), 1.0)
         if duration_min <= 0:
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 from typing import Any, Mapping, Optional, Sequence, Tuple
 
-from indicators import body_ratio, detect_micro_range, wick_ratio
+from indicators import candle_ohlc, detect_micro_range
 
 Candle = Mapping[str, Any]
+# (open, high, low, close) ya convertidos a float
+OHLC = Tuple[float, float, float, float]
 PatternSignal = Tuple[Optional[str], Optional[str]]
 
 
@@ -19,8 +21,9 @@ def detect_bullish_pattern(candles: Sequence[Candle]) -> PatternSignal:
     if detect_micro_range(last3, lookback=len(last3), compression_ratio=0.18):
         return None, "micro range"
 
-    prev = last3[-2]
-    last = last3[-1]
+    # Cada vela se lee y convierte una sola vez para los tres patrones
+    prev = candle_ohlc(last3[-2])
+    last = candle_ohlc(last3[-1])
     if _engulfing(prev, last, bullish=True):
         return "engulfing", "bullish engulfing"
     if _momentum_bar(last, bullish=True):
@@ -39,8 +42,9 @@ def detect_bearish_pattern(candles: Sequence[Candle]) -> PatternSignal:
     if detect_micro_range(last3, lookback=len(last3), compression_ratio=0.18):
         return None, "micro range"
 
-    prev = last3[-2]
-    last = last3[-1]
+    # Cada vela se lee y convierte una sola vez para los tres patrones
+    prev = candle_ohlc(last3[-2])
+    last = candle_ohlc(last3[-1])
     if _engulfing(prev, last, bullish=False):
         return "engulfing", "bearish engulfing"
     if _momentum_bar(last, bullish=False):
@@ -50,31 +54,37 @@ def detect_bearish_pattern(candles: Sequence[Candle]) -> PatternSignal:
     return None, None
 
 
-def _engulfing(prev: Candle, last: Candle, bullish: bool) -> bool:
-    prev_high = float(prev.get("max", prev.get("high", 0.0)))
-    prev_low = float(prev.get("min", prev.get("low", 0.0)))
-    last_open = float(last.get("open", last.get("o", 0.0)))
-    last_close = float(last.get("close", last.get("c", 0.0)))
+def _engulfing(prev: OHLC, last: OHLC, bullish: bool) -> bool:
+    _, prev_high, prev_low, _ = prev
+    last_open, _, _, last_close = last
     if bullish:
         return last_close > last_open and last_close >= prev_high and last_open <= prev_low
     return last_close < last_open and last_close <= prev_low and last_open >= prev_high
 
 
-def _momentum_bar(candle: Candle, bullish: bool) -> bool:
-    ratio = body_ratio(candle)
-    lower_wick, upper_wick = wick_ratio(candle)
-    open_ = float(candle.get("open", 0.0))
-    close = float(candle.get("close", 0.0))
+def _shape(candle: OHLC) -> Tuple[float, float, float]:
+    """(body_ratio, lower_wick_ratio, upper_wick_ratio) of an OHLC tuple."""
+
+    open_, high, low, close = candle
+    range_ = max(high - low, 1e-9)
+    return (
+        abs(close - open_) / range_,
+        (min(open_, close) - low) / range_,
+        (high - max(open_, close)) / range_,
+    )
+
+
+def _momentum_bar(candle: OHLC, bullish: bool) -> bool:
+    ratio, lower_wick, upper_wick = _shape(candle)
+    open_, close = candle[0], candle[3]
     if bullish:
         return close > open_ and ratio >= 0.6 and upper_wick <= 0.25
     return close < open_ and ratio >= 0.6 and lower_wick <= 0.25
 
 
-def _reversal(prev: Candle, last: Candle, bullish: bool) -> bool:
-    lower_wick, upper_wick = wick_ratio(last)
-    ratio = body_ratio(last)
-    open_ = float(last.get("open", 0.0))
-    close = float(last.get("close", 0.0))
+def _reversal(prev: OHLC, last: OHLC, bullish: bool) -> bool:
+    ratio, lower_wick, upper_wick = _shape(last)
+    open_, close = last[0], last[3]
     if bullish:
         # Hammer-like rejection at lows
         return close > open_ and lower_wick >= 0.5 and ratio <= 0.4
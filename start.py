@@ -1,10 +1,16 @@
 ﻿import sys
 import os
 import time
-import threading
 import json
 from pathlib import Path
 
+# orjson si esta instalado; json estandar si no (ambos aceptan bytes y sus
+# errores de formato heredan de json.JSONDecodeError)
+try:
+    from orjson import loads as _json_loads  # type: ignore
+except Exception:
+    from json import loads as _json_loads
+
 # Asegurar que iqoptionapi estÃ¡ en el path, como antes
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "iqoptionapi"))
 
@@ -21,10 +27,10 @@ CONFIG_PATH = Path(__file__).with_name("config.json")
 def load_start_settings() -> dict:
     """Lee credenciales y ajustes basicos desde config.json si existe."""
     try:
-        with CONFIG_PATH.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
-            if isinstance(data, dict):
-                return data
+        # Una sola lectura en bytes, sin el decode iterativo de json.load
+        data = _json_loads(CONFIG_PATH.read_bytes())
+        if isinstance(data, dict):
+            return data
     except FileNotFoundError:
         print(f"[CONFIG] No se encontro {CONFIG_PATH.name}.")
     except json.JSONDecodeError as exc:
@@ -73,7 +79,6 @@ def main() -> None:
     bot.attach_watcher(watcher)
 
     watcher.start()
-    threading.Thread(target=watcher.watcher_loop, daemon=True).start()
 
     try:
         print("[BOT] Iniciando TradingLions_Reforged...")
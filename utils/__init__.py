@@ -4,6 +4,10 @@ from __future__ import annotations
 
 from typing import Any, Mapping, Sequence
 
+import numpy as np
+
+from indicators import ema_last2_kernel
+
 
 def safe_float(value: Any, default: float = 0.0) -> float:
     """Convert arbitrary values to float, falling back to a safe default."""
@@ -45,18 +49,29 @@ def normalize_direction(direction: Any) -> str:
     raise ValueError("direction must normalize to 'call' or 'put'")
 
 
+def _as_prices(values: Sequence[Any]) -> np.ndarray:
+    """float64 array with safe_float semantics; numeric input skips the per-item call."""
+
+    if isinstance(values, np.ndarray) and values.dtype == np.float64:
+        return np.ascontiguousarray(values)
+    try:
+        # Conversion en C; None (-> nan), anidados o texto invalido van al camino lento
+        prices = np.array(values, dtype=np.float64)
+        if prices.ndim == 1 and not np.isnan(prices).any():
+            return prices
+    except (TypeError, ValueError):
+        pass
+    return np.fromiter(map(safe_float, values), dtype=np.float64)
+
+
 def ema(values: Sequence[Any], period: int) -> float:
     """Simple EMA tailored for short M5 trend windows."""
 
-    sequence = [safe_float(v) for v in values]
-    if not sequence:
+    prices = _as_prices(values)
+    if prices.shape[0] == 0:
         return 0.0
-    period = max(1, int(period))
-    multiplier = 2 / (period + 1)
-    ema_value = sequence[0]
-    for price in sequence[1:]:
-        ema_value = (price - ema_value) * multiplier + ema_value
-    return ema_value
+    # Misma recurrencia (semilla en el primer valor) que el kernel compilado
+    return float(ema_last2_kernel(prices, max(1, int(period)))[0])
 
 
 __all__ = [
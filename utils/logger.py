@@ -4,9 +4,12 @@ import csv
 import json
 import time
 from pathlib import Path
-from typing import Any, Mapping
+from typing import Any, Mapping, Optional
 
-from logger import CSV_HEADER, ensure_csv_header
+from logger import _JSON_COLUMNS, CSV_HEADER, _jsonl_line, ensure_csv_header
+
+# (columna, va como JSON) en el orden de CSV_HEADER, calculado una vez
+_CSV_COLUMNS = tuple((key, key in _JSON_COLUMNS) for key in CSV_HEADER)
 
 
 class StandaloneResultLogger:
@@ -15,22 +18,38 @@ class StandaloneResultLogger:
     def __init__(self, log_dir: str | Path) -> None:
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        # [inicio, fin) del ultimo dia local resuelto y sus rutas
+        self._day_span: tuple[float, float] = (0.0, 0.0)
+        self._day_paths: Optional[tuple[Path, Path]] = None
+        self._headers_checked: set[Path] = set()
 
     def _paths_for_timestamp(self, ts: float) -> tuple[Path, Path]:
-        date_label = time.strftime("%Y-%m-%d", time.localtime(ts))
+        start, end = self._day_span
+        if self._day_paths is not None and start <= ts < end:
+            return self._day_paths
+        local = time.localtime(ts)
+        date_label = time.strftime("%Y-%m-%d", local)
+        # Limites por mktime (no ts // 86400): respeta zona horaria y DST
+        day = (local.tm_year, local.tm_mon, local.tm_mday)
+        self._day_span = (
+            time.mktime(day + (0, 0, 0, 0, 0, -1)),
+            time.mktime((day[0], day[1], day[2] + 1, 0, 0, 0, 0, 0, -1)),
+        )
         csv_path = self.log_dir / f"trades_{date_label}.csv"
         jsonl_path = self.log_dir / f"trades_{date_label}.jsonl"
+        self._day_paths = (csv_path, jsonl_path)
         return csv_path, jsonl_path
 
     def _write_jsonl(self, path: Path, payload: Mapping[str, Any]) -> None:
-        with path.open("a", encoding="utf-8") as handle:
-            handle.write(json.dumps(payload, ensure_ascii=False) + "\n")
+        # Mismo encoder que logger.py (orjson si esta instalado), en binario
+        with path.open("ab") as handle:
+            handle.write(_jsonl_line(payload))
 
     def _write_csv(self, path: Path, payload: Mapping[str, Any]) -> None:
         row: list[Any] = []
-        for key in CSV_HEADER:
+        for key, is_json in _CSV_COLUMNS:
             value = payload.get(key, "")
-            if key in {"context", "decision_context", "logic", "metadata"}:
+            if is_json:
                 if value not in (None, ""):
                     value = json.dumps(value, ensure_ascii=False)
                 else:
@@ -45,7 +64,9 @@ class StandaloneResultLogger:
         record["timestamp"] = ts
         record["status"] = "CLOSE"
         csv_path, jsonl_path = self._paths_for_timestamp(ts)
-        ensure_csv_header(str(csv_path))
+        if csv_path not in self._headers_checked:
+            ensure_csv_header(str(csv_path))
+            self._headers_checked.add(csv_path)
         self._write_jsonl(jsonl_path, record)
         self._write_csv(csv_path, record)
 
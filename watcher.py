@@ -2,32 +2,52 @@
 
 import csv
 import glob
+import io
 import json
 import os
 import time
-from dataclasses import dataclass
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
+from functools import lru_cache
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
 
 import curses
 
+import numpy as np
+
 try:
     from iqoptionapi.stable_api import IQ_Option  # type: ignore
 except Exception:  # pragma: no cover
     IQ_Option = None  # type: ignore
 
+# Numba opcional: sin el, los CLOSE se acumulan fila a fila en Python
+try:
+    from numba import njit  # type: ignore
+except Exception:
+    njit = None
+
+# pyarrow opcional: lector columnar para la carga completa de un CSV grande
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    import pyarrow.csv as pacsv  # type: ignore
+except Exception:
+    pa = pc = pacsv = None
 
+
+@lru_cache(maxsize=1)
 def _discover_log_dir() -> Path:
-    cfg_path = Path("config.json")
-    if cfg_path.exists():
-        try:
-            data = json.loads(cfg_path.read_text(encoding="utf-8"))
-            value = data.get("log_dir")
-            if isinstance(value, str) and value.strip():
-                return Path(value)
-        except Exception:
-            pass
+    # Un solo intento de lectura (sin exists() previo); sin config.json cae al except
+    try:
+        data = json.loads(Path("config.json").read_bytes())
+        value = data.get("log_dir")
+        if isinstance(value, str) and value.strip():
+            return Path(value)
+    except Exception:
+        pass
     try:
         from config import BotConfig  # type: ignore
 
@@ -42,7 +62,8 @@ REFRESH_SECONDS = 1.0
 
 def safe_float(value: Any, default: float = 0.0) -> float:
     try:
-        if value in ("", None, ""):
+        # Celdas CSV: vacia o ausente va directo al default, sin excepcion
+        if value is None or value == "":
             return float(default)
         return float(value)
     except (TypeError, ValueError):
@@ -79,6 +100,13 @@ class SafeScreen:
         except Exception:
             pass
 
+    def clear_line(self, y: int) -> None:
+        try:
+            self._screen.move(y, 0)
+            self._screen.clrtoeol()
+        except Exception:
+            pass
+
 
 def init_colors() -> None:
     curses.start_color()
@@ -90,12 +118,9 @@ def init_colors() -> None:
     curses.init_pair(5, curses.COLOR_WHITE, -1)
 
 
-def profit_bar(value: float, width: int = 40, scale: float = 50.0) -> str:
-    half = max(1, width // 2)
-    if scale <= 0:
-        scale = 1.0
-    ratio = max(-1.0, min(1.0, value / scale))
-    fill = int(round(ratio * half))
+@lru_cache(maxsize=128)
+def _bar(half: int, fill: int) -> str:
+    # Solo hay 2*half+1 barras posibles por ancho: cada una se arma una vez
     left_fill = min(0, fill)
     right_fill = max(0, fill)
     left = "-" * (half + left_fill) + " " * (-left_fill)
@@ -103,160 +128,602 @@ def profit_bar(value: float, width: int = 40, scale: float = 50.0) -> str:
     return f"[{left}|{right}]"
 
 
-@dataclass
+def profit_bar(value: float, width: int = 40, scale: float = 50.0) -> str:
+    half = max(1, width // 2)
+    if scale <= 0:
+        scale = 1.0
+    ratio = max(-1.0, min(1.0, value / scale))
+    return _bar(half, int(round(ratio * half)))
+
+
+@dataclass(slots=True, frozen=True)
+class RecentTrade:
+    time: str
+    trade_id: Optional[str]
+    asset: Optional[str]
+    outcome: Optional[str]
+    profit: float
+    entry_price: Optional[str]
+    close_price: Optional[str]
+
+
+@dataclass(slots=True)
 class DashboardData:
     total: int = 0
     wins: int = 0
     losses: int = 0
     draws: int = 0
     profit: float = 0.0
-    recent: List[Dict[str, Any]] = None
+    recent: List[RecentTrade] = field(default_factory=list)
     wins_value: float = 0.0
     losses_value: float = 0.0
     max_profit: float = 0.0
     max_loss: float = 0.0
 
 
-def read_latest_trades() -> DashboardData:
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
-    files = sorted(LOG_DIR.glob("trades_*.csv"))
-    if not files:
-        return DashboardData(total=0, wins=0, losses=0, draws=0, profit=0.0, recent=[])
+class _CloseRow(NamedTuple):
+    """Columnas de una fila CLOSE que usa el dashboard."""
+
+    trade_id: Optional[str]
+    asset: Optional[str]
+    outcome_real: Optional[str]
+    profit_real: Optional[str]
+    entry_price: Optional[str]
+    close_price: Optional[str]
+    close_time: Optional[str]
+    timestamp: Optional[str]
+
+
+@dataclass
+class _WatcherState:
+    """Lectura incremental del CSV del dia: offset ya procesado y acumulados."""
+
+    path: Optional[Path] = None
+    inode: int = 0
+    offset: int = 0
+    header: List[str] = field(default_factory=list)
+    # Posiciones resueltas una vez desde header (ver _resolve_columns)
+    status_col: int = 0
+    pick: Optional[Callable[[List[Any]], tuple]] = None
+    width: int = 0
+    # Clave (close_time o timestamp) del ultimo CLOSE acumulado
+    last_key: float = float("-inf")
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    profit: float = 0.0
+    wins_value: float = 0.0
+    losses_value: float = 0.0
+    running_total: float = 0.0
+    max_running: float = 0.0
+    min_running: float = 0.0
+    recent: Deque[_CloseRow] = field(default_factory=lambda: deque(maxlen=10))
+    # Entradas de DashboardData.recent; None si recent cambio desde el ultimo armado
+    recent_entries: Optional[List[RecentTrade]] = None
+    # Ultimo DashboardData entregado y el offset con el que se armo
+    data: Optional[DashboardData] = None
+    data_offset: int = -1
+
 
-    path = files[-1]
-    rows: List[Dict[str, str]] = []
-    with path.open("r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if str(row.get("status", "")).upper() != "CLOSE":
+_STATE = _WatcherState()
+
+# (directorio, mtime_ns, instante del escaneo en ns, ultimo trades_*.csv)
+_LATEST_CACHE: Tuple[Optional[Path], int, int, Optional[Path]] = (None, -1, 0, None)
+# Un mtime tan cercano al escaneo puede no reflejar un alta posterior dentro
+# del mismo tick del reloj del sistema de archivos (FAT/ext3: 1-2 s)
+_MTIME_SLACK_NS = 2_000_000_000
+
+
+def _cached_latest(log_dir: Path) -> Optional[Path]:
+    """Ultimo trades_<fecha>.csv de *log_dir*; solo se relista si cambia el mtime del directorio."""
+    global _LATEST_CACHE
+    try:
+        mtime = os.stat(log_dir).st_mtime_ns
+    except FileNotFoundError:
+        log_dir.mkdir(parents=True, exist_ok=True)
+        mtime = os.stat(log_dir).st_mtime_ns
+    cached_dir, cached_mtime, scanned_at, latest = _LATEST_CACHE
+    if cached_dir == log_dir and cached_mtime == mtime and scanned_at - mtime > _MTIME_SLACK_NS:
+        return latest
+    scanned_at = time.time_ns()
+    # Nombres con fecha ISO: el maximo lexico es el dia mas reciente
+    with os.scandir(log_dir) as entries:
+        name = max(
+            (
+                entry.name
+                for entry in entries
+                if entry.name.startswith("trades_") and entry.name.endswith(".csv")
+            ),
+            default=None,
+        )
+    latest = log_dir / name if name is not None else None
+    _LATEST_CACHE = (log_dir, mtime, scanned_at, latest)
+    return latest
+
+
+def _close_key(row: _CloseRow) -> float:
+    # safe_float en linea: celdas str o None, sin la llamada extra por fila
+    value = row.close_time or row.timestamp
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _ascending(keys: List[float], start: float) -> bool:
+    prev = start
+    for key in keys:
+        if key < prev:
+            return False
+        prev = key
+    return True
+
+
+def _resolve_columns(state: _WatcherState, header: List[str]) -> None:
+    state.header = header
+    index = {name: i for i, name in enumerate(header)}
+    # Una columna ausente apunta a una celda extra que se rellena con None
+    missing = len(header)
+    positions = [index.get(name, missing) for name in _CloseRow._fields]
+    state.status_col = index.get("status", missing)
+    state.pick = itemgetter(*positions)
+    # Largo de las filas que se usan tal cual; -1 (con columnas ausentes)
+    # hace que todas pasen por el relleno
+    state.width = -1 if missing in positions or state.status_col == missing else missing
+
+
+def _read_new_close_rows(state: _WatcherState, path: Path, size: int) -> List[_CloseRow]:
+    """Filas CLOSE escritas desde state.offset hasta *size* (solo lineas completas)."""
+    # Sin buffer intermedio: el tramo nuevo (tamano conocido por el stat) en un read
+    with open(path, "rb", buffering=0) as f:
+        f.seek(state.offset)
+        chunk = f.read(size - state.offset)
+    # Una linea a medio escribir se deja para la proxima lectura
+    end = chunk.rfind(b"\n") + 1
+    if not end:
+        return []
+    state.offset += end
+    # Decodifica en bloque sin copiar el tramo; un byte invalido no tumba el panel
+    text = str(memoryview(chunk)[:end], "utf-8", "replace")
+    reader = csv.reader(io.StringIO(text, newline=""))
+    if state.pick is None:
+        _resolve_columns(state, next(reader, []))
+    status_col = state.status_col
+    pick = state.pick
+    columns = len(state.header)
+    width = state.width
+    make = _CloseRow._make
+    rows: List[_CloseRow] = []
+    for raw in reader:
+        if len(raw) != width:
+            if not raw:
+                continue
+            # Fila corta o con celdas de mas: como DictReader (None si falta)
+            raw = raw[:columns] + [None] * (columns + 1 - min(len(raw), columns))
+        status = raw[status_col]
+        # Literales canonicos del logger primero (comparacion directa); solo
+        # un estado distinto de CLOSE/OPEN se normaliza con upper()
+        if status != "CLOSE":
+            if status == "OPEN" or str(status).upper() != "CLOSE":
                 continue
-            rows.append(row)
+        rows.append(make(pick(raw)))
+    return rows
 
-    if not rows:
-        return DashboardData(total=0, wins=0, losses=0, draws=0, profit=0.0, recent=[])
 
-    wins = losses = draws = 0
-    profit = 0.0
-    wins_value = 0.0
-    losses_value = 0.0
-    running_total = 0.0
-    max_running = 0.0
-    min_running = 0.0
-    ordered_rows = sorted(
-        rows,
-        key=lambda row: safe_float(
-            row.get("close_time") or row.get("timestamp"), 0.0
-        ),
-    )
-    recent: List[Dict[str, Any]] = []
+# outcome_real -> codigo (3: ninguno de los tres); tambien lo usa el kernel
+_OUTCOME_CODES = {"WIN": 0, "LOSS": 1, "DRAW": 2}
 
-    for row in ordered_rows:
-        outcome = str(row.get("outcome_real", "")).upper()
-        p = safe_float(row.get("profit_real"), 0.0)
+
+def _outcome_code(outcome: Optional[str]) -> int:
+    # El logger escribe las etiquetas en mayusculas: un solo lookup, sin
+    # str()/upper(); el resto se normaliza como antes
+    code = _OUTCOME_CODES.get(outcome)
+    if code is None:
+        code = _OUTCOME_CODES.get(str(outcome).upper(), 3)
+    return code
+
+
+def _fold_row(state: _WatcherState, row: _CloseRow) -> None:
+    code = _outcome_code(row.outcome_real)
+    value = row.profit_real
+    try:
+        p = float(value) if value else 0.0
+    except (TypeError, ValueError):
+        p = 0.0
+    state.profit += p
+    if p >= 0:
+        state.wins_value += p
+    else:
+        state.losses_value += p
+    state.running_total += p
+    state.max_running = max(state.max_running, state.running_total)
+    state.min_running = min(state.min_running, state.running_total)
+    if code == 0:
+        state.wins += 1
+    elif code == 1:
+        state.losses += 1
+    elif code == 2:
+        state.draws += 1
+    state.recent.append(row)
+
+# Por debajo de este lote (el caso normal: 0-2 cierres por tick) armar los
+# arrays cuesta mas que el bucle Python
+_KERNEL_MIN_ROWS = 64
+
+
+def _aggregate_kernel(
+    profits, outcomes, wins, losses, draws, profit, wins_value, losses_value,
+    running_total, max_running, min_running,
+):
+    # Mismo recorrido que _fold_row, en el orden de las filas
+    for i in range(profits.shape[0]):
+        p = profits[i]
         profit += p
         if p >= 0:
             wins_value += p
         else:
             losses_value += p
         running_total += p
-        max_running = max(max_running, running_total)
-        min_running = min(min_running, running_total)
-        if outcome == "WIN":
+        if running_total > max_running:
+            max_running = running_total
+        if running_total < min_running:
+            min_running = running_total
+        code = outcomes[i]
+        if code == 0:
             wins += 1
-        elif outcome == "LOSS":
+        elif code == 1:
             losses += 1
-        elif outcome == "DRAW":
+        elif code == 2:
             draws += 1
+    return (
+        wins, losses, draws, profit, wins_value, losses_value,
+        running_total, max_running, min_running,
+    )
 
-    for row in ordered_rows[-10:]:
-        recent.append(
-            {
-                "trade_id": row.get("trade_id"),
-                "asset": row.get("asset"),
-                "outcome": row.get("outcome_real"),
-                "profit": safe_float(row.get("profit_real"), 0.0),
-                "entry_price": row.get("entry_price"),
-                "close_price": row.get("close_price"),
-                "time": datetime.fromtimestamp(float(row.get("close_time", 0.0))).strftime("%H:%M:%S")
-                if row.get("close_time")
-                else "",
-            }
-        )
 
-    return DashboardData(
-        total=wins + losses + draws,
-        wins=wins,
-        losses=losses,
-        draws=draws,
-        profit=profit,
-        recent=recent,
-        wins_value=wins_value,
-        losses_value=losses_value,
-        max_profit=max_running,
-        max_loss=min_running,
+if njit is not None:
+    # Firma explicita: se compila (o carga del cache) al importar. Sin nnan/ninf
+    # (un profit_real "nan" se compara igual que en Python) ni reassoc (las
+    # sumas siguen el orden de las filas, como _fold_row)
+    _aggregate = njit(
+        "Tuple((int64, int64, int64, float64, float64, float64, float64, float64, float64))"
+        "(float64[::1], int8[::1], int64, int64, int64,"
+        " float64, float64, float64, float64, float64, float64)",
+        cache=True,
+        fastmath={"nsz", "arcp", "contract", "afn"},
+    )(_aggregate_kernel)
+else:
+    _aggregate = None
+
+
+def _fold_rows(state: _WatcherState, rows: List[_CloseRow]) -> None:
+    if not rows:
+        return
+    state.recent_entries = None
+    if _aggregate is None or len(rows) < _KERNEL_MIN_ROWS:
+        for row in rows:
+            _fold_row(state, row)
+        return
+    count = len(rows)
+    profits = np.fromiter(
+        (safe_float(row.profit_real, 0.0) for row in rows), dtype=np.float64, count=count
+    )
+    outcomes = np.fromiter(
+        (_outcome_code(row.outcome_real) for row in rows), dtype=np.int8, count=count
     )
+    (
+        state.wins,
+        state.losses,
+        state.draws,
+        state.profit,
+        state.wins_value,
+        state.losses_value,
+        state.running_total,
+        state.max_running,
+        state.min_running,
+    ) = _aggregate(
+        profits,
+        outcomes,
+        state.wins,
+        state.losses,
+        state.draws,
+        state.profit,
+        state.wins_value,
+        state.losses_value,
+        state.running_total,
+        state.max_running,
+        state.min_running,
+    )
+    state.recent.extend(rows)
 
 
-def dashboard(stdscr: curses.window) -> None:
-    screen = SafeScreen(stdscr)
-    curses.curs_set(0)
-    stdscr.nodelay(True)
-    init_colors()
+# Desde este tamano la carga completa del dia pasa por pyarrow (si esta)
+_ARROW_MIN_BYTES = 1 << 20
+_ARROW_COLUMNS = ("status",) + _CloseRow._fields
 
-    while True:
-        screen.erase()
-        now = datetime.now().strftime("%H:%M:%S")
-        data = read_latest_trades()
 
-        if data.total > 0:
-            winrate = data.wins / data.total * 100.0
-        else:
-            winrate = 0.0
+def _arrow_floats(values: Any) -> np.ndarray:
+    """Columna str de Arrow a float64 como safe_float (vacio, nulo o invalido: 0.0)."""
+    text = pc.fill_null(values, "")
+    try:
+        return pc.cast(pc.if_else(pc.equal(text, ""), "0", text), pa.float64()).to_numpy()
+    except pa.ArrowInvalid:
+        # Algun valor que Arrow no convierte: se resuelve celda a celda
+        out = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values.to_pylist()):
+            try:
+                out[i] = float(value) if value else 0.0
+            except (TypeError, ValueError):
+                out[i] = 0.0
+        return out
+
+
+def _load_day_arrow(state: _WatcherState, path: Path, size: int) -> bool:
+    """Carga completa por columnas; False (sin tocar *state*) si debe ir por csv.reader."""
+    with open(path, "rb", buffering=0) as f:
+        data = f.read(size)
+    end = data.rfind(b"\n") + 1
+    if not end:
+        return False
+    try:
+        table = pacsv.read_csv(
+            pa.py_buffer(memoryview(data)[:end]),
+            read_options=pacsv.ReadOptions(block_size=1 << 20),
+            parse_options=pacsv.ParseOptions(newlines_in_values=True),
+            convert_options=pacsv.ConvertOptions(
+                # Esquema explicito, sin inferencia. Todo como string a
+                # proposito: float64 rechaza celdas que safe_float acepta y
+                # no fue mas rapido; dictionary en status/outcome_real
+                # tampoco (lo que ahorra el filtro lo cuesta la lectura)
+                column_types={name: pa.string() for name in _ARROW_COLUMNS},
+                include_columns=list(_ARROW_COLUMNS),
+                include_missing_columns=True,
+            ),
+        )
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        # Filas de largo irregular o bytes no UTF-8: el lector Python las tolera
+        return False
+    status = table["status"]
+    table = table.filter(
+        pc.or_(pc.equal(status, "CLOSE"), pc.equal(pc.utf8_upper(status), "CLOSE"))
+    )
+    close_time = table["close_time"]
+    keys = _arrow_floats(
+        pc.if_else(pc.equal(pc.fill_null(close_time, ""), ""), table["timestamp"], close_time)
+    )
+    if np.isnan(keys).any():
+        return False
+    profits = _arrow_floats(table["profit_real"])
+    outcomes = pc.index_in(
+        pc.utf8_upper(table["outcome_real"]), value_set=pa.array(list(_OUTCOME_CODES))
+    )
+    codes = pc.fill_null(outcomes, 3).to_numpy().astype(np.int8)
+    if keys.size and (keys[1:] < keys[:-1]).any():
+        order = np.argsort(keys, kind="stable")
+        keys, profits, codes = keys[order], profits[order], codes[order]
+        table = table.take(pa.array(order))
+
+    first_line = data[: data.index(b"\n") + 1].decode("utf-8")
+    _resolve_columns(state, next(csv.reader([first_line]), []))
+    state.offset = end
+    if keys.size:
+        (
+            state.wins,
+            state.losses,
+            state.draws,
+            state.profit,
+            state.wins_value,
+            state.losses_value,
+            state.running_total,
+            state.max_running,
+            state.min_running,
+        ) = _aggregate(
+            # Copias contiguas y escribibles (los buffers de Arrow son de solo lectura)
+            np.array(profits, dtype=np.float64),
+            np.array(codes, dtype=np.int8),
+            state.wins,
+            state.losses,
+            state.draws,
+            state.profit,
+            state.wins_value,
+            state.losses_value,
+            state.running_total,
+            state.max_running,
+            state.min_running,
+        )
+        tail = table.slice(max(0, table.num_rows - state.recent.maxlen))
+        columns = [tail[name].to_pylist() for name in _CloseRow._fields]
+        state.recent.extend(_CloseRow._make(values) for values in zip(*columns))
+        state.recent_entries = None
+        state.last_key = float(keys[-1])
+    return True
+
+
+def _load_day(state: _WatcherState, path: Path, size: int) -> None:
+    """Carga completa del dia sobre un estado recien creado, en orden de close_time."""
+    if pacsv is not None and _aggregate is not None and size >= _ARROW_MIN_BYTES:
+        if _load_day_arrow(state, path, size):
+            return
+    rows = _read_new_close_rows(state, path, size)
+    keys = [_close_key(row) for row in rows]
+    if not _ascending(keys, state.last_key):
+        pairs = sorted(zip(keys, rows), key=itemgetter(0))
+        keys = [key for key, _ in pairs]
+        rows = [row for _, row in pairs]
+    _fold_rows(state, rows)
+    if keys:
+        state.last_key = keys[-1]
+
+
+@lru_cache(maxsize=1024)
+def _fmt_hms(ts: float) -> str:
+    # Clave float (no int): fromtimestamp redondea microsegundos y eso
+    # puede cambiar el segundo mostrado
+    return datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+
+
+def _recent_entry(row: _CloseRow) -> RecentTrade:
+    close_time = row.close_time
+    return RecentTrade(
+        time=_fmt_hms(float(close_time)) if close_time else "",
+        trade_id=row.trade_id,
+        asset=row.asset,
+        outcome=row.outcome_real,
+        profit=safe_float(row.profit_real, 0.0),
+        entry_price=row.entry_price,
+        close_price=row.close_price,
+    )
 
-        screen.addstr(0, 2, "=== TRADING LIONS DASHBOARD (solo lectura de logs) ===", curses.color_pair(4))
-        screen.addstr(1, 2, f"Hora local: {now}", curses.color_pair(5))
 
-        y = 3
-        screen.addstr(y, 2, f"Trades totales: {data.total}", curses.color_pair(5))
-        y += 1
-        screen.addstr(y, 2, f"Wins: {data.wins}   Losses: {data.losses}   Draws: {data.draws}", curses.color_pair(5))
-        y += 1
-        screen.addstr(y, 2, f"Winrate: {winrate:.1f} %", curses.color_pair(3))
-        y += 1
+def read_latest_trades() -> DashboardData:
+    global _STATE
+    path = _cached_latest(LOG_DIR)
+    if path is None:
+        return DashboardData(total=0, wins=0, losses=0, draws=0, profit=0.0, recent=[])
 
-        color_profit = 1 if data.profit >= 0 else 2
-        screen.addstr(y, 2, f"Profit acumulado (neto): {data.profit:+.2f} USD", curses.color_pair(color_profit))
-        y += 1
-        screen.addstr(y, 2, f"Ganado: +{data.wins_value:.2f} USD   Perdido: -{abs(data.losses_value):.2f} USD", curses.color_pair(5))
-        y += 1
-        screen.addstr(y, 2, profit_bar(data.profit), curses.color_pair(3))
-        y += 1
-        screen.addstr(y, 2, f"Top profit del dia: {data.max_profit:+.2f} USD", curses.color_pair(1 if data.max_profit >= 0 else 2))
-        y += 1
-        screen.addstr(y, 2, f"Top perdida acumulada: {data.max_loss:+.2f} USD", curses.color_pair(2 if data.max_loss < 0 else 5))
-        y += 2
-        screen.addstr(y, 2, "Ultimos cierres:", curses.color_pair(3))
+    stat = path.stat()
+    state = _STATE
+    # Archivo nuevo (cambio de dia), reemplazado (migracion de encabezado) o
+    # truncado: se vuelve a leer desde el principio
+    if path != state.path or stat.st_ino != state.inode or stat.st_size < state.offset:
+        state = _STATE = _WatcherState(path=path, inode=stat.st_ino)
+
+    if stat.st_size > state.offset and state.offset == 0:
+        _load_day(state, path, stat.st_size)
+    elif stat.st_size > state.offset:
+        rows = _read_new_close_rows(state, path, stat.st_size)
+        keys = [_close_key(row) for row in rows]
+        # Los acumulados siguen el orden de close_time. El log se escribe en
+        # orden, asi que basta comprobarlo: solo si llega un cierre anterior
+        # al ultimo acumulado se recalcula el dia, y solo entonces se ordena
+        if _ascending(keys, state.last_key):
+            _fold_rows(state, rows)
+            if keys:
+                state.last_key = keys[-1]
+        else:
+            state = _STATE = _WatcherState(path=path, inode=stat.st_ino)
+            _load_day(state, path, stat.st_size)
+
+    # Sin bytes nuevos (la mayoria de los ticks) se devuelve el mismo objeto
+    if state.data is None or state.data_offset != state.offset:
+        if state.recent_entries is None:
+            state.recent_entries = [_recent_entry(row) for row in state.recent]
+        state.data = DashboardData(
+            total=state.wins + state.losses + state.draws,
+            wins=state.wins,
+            losses=state.losses,
+            draws=state.draws,
+            profit=state.profit,
+            recent=list(state.recent_entries),
+            wins_value=state.wins_value,
+            losses_value=state.losses_value,
+            max_profit=state.max_running,
+            max_loss=state.min_running,
+        )
+        state.data_offset = state.offset
+    return state.data
+
+
+# Fila -> (x, texto, color_pair) de un frame del dashboard
+Frame = Dict[int, Tuple[int, str, int]]
+
+# Filas fijas: se construyen una sola vez al importar, no en cada tick
+_ROW_TITLE = (2, "=== TRADING LIONS DASHBOARD (solo lectura de logs) ===", 4)
+_ROW_RECENT = (2, "Ultimos cierres:", 3)
+_ROW_FOOTER = (2, "Presiona 'q' para salir del dashboard.", 5)
+# Color de cada ultimo cierre segun outcome; el resto va en amarillo
+_OUTCOME_PAIRS = {"WIN": 1, "LOSS": 2}
+
+
+def _render_lines(data: DashboardData, now: str, lines: int) -> Frame:
+    if data.total > 0:
+        winrate = data.wins / data.total * 100.0
+    else:
+        winrate = 0.0
+
+    frame: Frame = {
+        0: _ROW_TITLE,
+        1: (2, f"Hora local: {now}", 5),
+        3: (2, f"Trades totales: {data.total}", 5),
+        # Ancho fijo: las columnas no se desplazan cuando un contador gana un digito
+        4: (2, f"Wins: {data.wins:<4d}  Losses: {data.losses:<4d}  Draws: {data.draws}", 5),
+        5: (2, f"Winrate: {winrate:.1f} %", 3),
+        6: (2, f"Profit acumulado (neto): {data.profit:+.2f} USD", 1 if data.profit >= 0 else 2),
+        7: (2, f"Ganado: +{data.wins_value:.2f} USD   Perdido: -{abs(data.losses_value):.2f} USD", 5),
+        8: (2, profit_bar(data.profit), 3),
+        9: (2, f"Top profit del dia: {data.max_profit:+.2f} USD", 1 if data.max_profit >= 0 else 2),
+        10: (2, f"Top perdida acumulada: {data.max_loss:+.2f} USD", 2 if data.max_loss < 0 else 5),
+        12: _ROW_RECENT,
+    }
+    y = 13
+    last = lines - 3
+    pairs = _OUTCOME_PAIRS
+    for t in data.recent:
+        outcome = str(t.outcome).upper()
+        frame[y] = (
+            4,
+            f"{t.time} {t.trade_id} {t.asset} {outcome} {t.profit:+.2f} ({t.entry_price} -> {t.close_price})",
+            pairs.get(outcome, 3),
+        )
         y += 1
-        for t in data.recent:
-            outcome = str(t.get("outcome", "")).upper()
-            col = 1 if outcome == "WIN" else 2 if outcome == "LOSS" else 3
-            screen.addstr(
-                y,
-                4,
-                f"{t['time']} {t['trade_id']} {t['asset']} {outcome} {t['profit']:+.2f} ({t['entry_price']} -> {t['close_price']})",
-                curses.color_pair(col),
-            )
-            y += 1
-            if y > curses.LINES - 3:
-                break
-
-        screen.addstr(curses.LINES - 2, 2, "Presiona 'q' para salir del dashboard.", curses.color_pair(5))
-        screen.refresh()
+        if y > last:
+            break
+
+    frame[lines - 2] = _ROW_FOOTER
+    return frame
+
+
+class Dashboard:
+    """Repinta solo las filas que cambiaron respecto al frame anterior."""
+
+    def __init__(self, stdscr: curses.window) -> None:
+        self._stdscr = stdscr
+        self._screen = SafeScreen(stdscr)
+        self._prev_lines: Frame = {}
+        self._attrs = {pair: curses.color_pair(pair) for pair in range(1, 6)}
+
+    def invalidate(self) -> None:
+        self._screen.erase()
+        self._prev_lines = {}
+
+    def draw(self, frame: Frame) -> None:
+        screen = self._screen
+        prev = self._prev_lines
+        attrs = self._attrs
+        for y in prev.keys() - frame.keys():
+            screen.clear_line(y)
+        for y, line in frame.items():
+            if prev.get(y) == line:
+                continue
+            x, text, pair = line
+            screen.clear_line(y)
+            screen.addstr(y, x, text, attrs[pair])
+        self._prev_lines = frame
+        # Un solo volcado a la terminal por tick
+        self._stdscr.noutrefresh()
+        curses.doupdate()
+
+
+def dashboard(stdscr: curses.window) -> None:
+    curses.curs_set(0)
+    init_colors()
+    # getch espera hasta REFRESH_SECONDS: redibuja al vencer y responde a
+    # la tecla al instante, sin sleep aparte
+    stdscr.timeout(int(REFRESH_SECONDS * 1000))
+    view = Dashboard(stdscr)
+    view.invalidate()
+
+    while True:
+        now = datetime.now().strftime("%H:%M:%S")
+        view.draw(_render_lines(read_latest_trades(), now, curses.LINES))
 
         ch = stdscr.getch()
         if ch in (ord("q"), ord("Q")):
             break
-        time.sleep(REFRESH_SECONDS)
+        if ch == curses.KEY_RESIZE:
+            view.invalidate()
 
 
 def main() -> None: